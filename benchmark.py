@@ -0,0 +1,64 @@
+import argparse
+import json
+from src.benchmark import run_suite, suite_cases
+from src.graph import GrowthSchedule
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark headless rendering of Graph and BarChartAnimation."
+    )
+    parser.add_argument(
+        "--entities",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10_000, 100_000],
+        help="Entity counts (default: 10 to 100000)",
+    )
+    parser.add_argument(
+        "--timepoints",
+        type=int,
+        nargs="+",
+        default=[20, 200],
+        help="Timepoint counts for BarChartAnimation",
+    )
+    parser.add_argument(
+        "--to-show",
+        type=int,
+        nargs="+",
+        default=[10, 30],
+        help="Bars on screen for BarChartAnimation",
+    )
+    parser.add_argument(
+        "--animation-types",
+        nargs="+",
+        choices=GrowthSchedule.TYPES,
+        default=list(GrowthSchedule.TYPES),
+        help="Graph animation types",
+    )
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        choices=["graph", "bar_chart"],
+        default=["graph", "bar_chart"],
+    )
+    parser.add_argument(
+        "--max-frames", type=int, default=600, help="Frames rendered per case at most"
+    )
+    parser.add_argument(
+        "--output", default="benchmark.json", help="JSON file for the results"
+    )
+    args = parser.parse_args()
+
+    cases = suite_cases(
+        args.entities, args.timepoints, args.to_show, args.animation_types
+    )
+    cases = [case for case in cases if case["engine"] in args.engines]
+    report = run_suite(cases, args.max_frames)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,21 @@
 import sys, os
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 
 root_dir = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
 sys.path.append(root_dir)
 from src.racing_bar_chart import AnimatedGraph, PyGamerExt, GraphTheme, LayoutConfig
+from src.datasets import open_dataset, register_dataset
+
+DATA_DIR = "projects/AQI-Data-India/data"
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+# Bump whenever the daily AQI calculation changes, so cached stations are
+# recomputed
+PIPELINE_VERSION = 1
 
 BREAKPOINTS = {
     "PM10": {
@@ -74,6 +85,51 @@ BREAKPOINTS = {
 }
 
 
+# AQI range of each category
+AQI_RANGES = {
+    "Good": (0, 50),
+    "Satisfactory": (51, 100),
+    "Moderately polluted": (101, 200),
+    "Poor": (201, 300),
+    "Very poor": (301, 400),
+    "Severe": (401, 500),
+}
+
+# Mapping of pollutant names to their column names
+COLUMN_MAPPING = {
+    "PM10": "PM10 (ug/m3)",
+    "PM2.5": "PM2.5 (ug/m3)",
+    "NO2": "NO2 (ug/m3)",
+    "O3": "Ozone (ug/m3)",
+    "CO": "CO (mg/m3)",
+    "SO2": "SO2 (ug/m3)",
+    "NH3": "NH3 (ug/m3)",
+}
+
+
+def round_exact(values, decimals):
+    """
+    Round an array exactly like Python's round() on each element
+
+    np.round scales, rounds and unscales, which can land on the other side
+    of a tie than the correctly rounded result; values close to a tie are
+    rounded one by one with round() instead.
+
+    Parameters:
+    values: Array of floats
+    decimals: Number of decimal places
+
+    Returns:
+    np.ndarray: Rounded values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, decimals)
+    scaled = values * 10**decimals
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    rounded[near_tie] = [round(value, decimals) for value in values[near_tie].tolist()]
+    return rounded
+
+
 def calculate_sub_index(
     current_reading,
     prev_category_upper_limit,
@@ -85,6 +141,8 @@ def calculate_sub_index(
     """
     Calculate Sub Index for a pollutant using AQI formula
 
+    All parameters may be scalars or arrays of the same shape.
+
     Parameters:
     current_reading: Current pollutant reading
     prev_category_upper_limit: Upper limit of previous category
@@ -94,7 +152,7 @@ def calculate_sub_index(
     aqi_category_max: Upper AQI value for current category
 
     Returns:
-    float: Calculated Sub Index value
+    np.ndarray: Calculated Sub Index values
     """
 
     reading_interval = current_category_upper_limit - current_category_lower_limit
@@ -105,42 +163,139 @@ def calculate_sub_index(
         * (aqi_interval / reading_interval)
     )
 
-    return round(sub_index, 2)
+    return round_exact(sub_index, 2)
+
+
+def sub_indices(pollutant, readings):
+    """
+    Calculate the sub-index of every reading of a pollutant
+
+    Breakpoint upper limits increase with the category, so the first
+    category a reading can fall in is found by a binary search over them;
+    readings below that category's lower limit fall in a gap between
+    categories and get no sub-index.
+
+    Parameters:
+    pollutant: Key of BREAKPOINTS
+    readings: Array of readings, NaN where missing
+
+    Returns:
+    np.ndarray: Sub-indices, NaN where missing or outside every category
+    """
+    categories = list(BREAKPOINTS[pollutant].items())
+    lowers = np.array([lower for _, (lower, _) in categories], dtype=np.float64)
+    uppers = np.array([upper for _, (_, upper) in categories], dtype=np.float64)
+    prev_uppers = np.concatenate(([0.0], uppers[:-1]))
+    aqi_mins = np.array([AQI_RANGES[category][0] for category, _ in categories])
+    aqi_maxs = np.array([AQI_RANGES[category][1] for category, _ in categories])
+
+    readings = np.asarray(readings, dtype=np.float64)
+    category = np.searchsorted(uppers, readings, side="left")
+    valid = (category < len(categories)) & ~np.isnan(readings)
+    category = np.minimum(category, len(categories) - 1)
+    valid &= lowers[category] <= readings
+
+    result = np.full(len(readings), np.nan)
+    cat = category[valid]
+    result[valid] = calculate_sub_index(
+        readings[valid],
+        prev_uppers[cat],
+        lowers[cat],
+        uppers[cat],
+        aqi_mins[cat],
+        aqi_maxs[cat],
+    )
+    return result
+
+
+def custom_dates(from_dates):
+    """
+    Get the AQI day of each reading; readings before 6 AM count towards the
+    previous day
+    """
+    return (from_dates - pd.Timedelta(hours=6)).dt.date
 
 
 def calculate_aqi(df):
     # Check which columns are actually present in the dataframe
     available_columns = df.columns.tolist()
 
-    df["custom_date"] = df["From Date"].apply(
-        lambda x: x.date() if x.hour >= 6 else (x - pd.Timedelta(days=1)).date()
-    )
-
-    # Create mapping of pollutant names to their column names
-    column_mapping = {
-        "PM10": "PM10 (ug/m3)",
-        "PM2.5": "PM2.5 (ug/m3)",
-        "NO2": "NO2 (ug/m3)",
-        "O3": "Ozone (ug/m3)",
-        "CO": "CO (mg/m3)",
-        "SO2": "SO2 (ug/m3)",
-        "NH3": "NH3 (ug/m3)",
-    }
+    df["custom_date"] = custom_dates(df["From Date"])
 
     # Filter to only include columns that are present in the data
     agg_dict = {}
-    for col in column_mapping.values():
+    for col in COLUMN_MAPPING.values():
         if col in available_columns:
             agg_dict[col] = "mean"
 
-    # Get daily means
-    daily_averages = df.groupby("custom_date").agg(agg_dict).round(2)
-    daily_averages = daily_averages.reset_index()
-
-    # Get daily counts
+    # Get daily means and counts
+    daily_means = df.groupby("custom_date").agg(agg_dict)
     count_dict = {col: "count" for col in agg_dict.keys()}
     daily_counts = df.groupby("custom_date").agg(count_dict)
 
+    return aqi_from_daily(daily_means, daily_counts)
+
+
+def stream_daily_aggregates(path, chunksize):
+    """
+    Calculate daily means and counts of a station file in chunks
+
+    Only one chunk of hourly readings is in memory at a time; each chunk
+    is reduced to per-day sums and counts that are added to the running
+    totals, so memory is bounded by the chunk size and the number of days.
+
+    Parameters:
+    path: Station CSV file
+    chunksize: Number of hourly rows to read at a time
+
+    Returns:
+    tuple: (daily means, daily counts) DataFrames indexed by custom_date
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    columns = [col for col in COLUMN_MAPPING.values() if col in header]
+
+    sums = None
+    counts = None
+    for chunk in pd.read_csv(
+        path,
+        usecols=["From Date"] + columns,
+        parse_dates=["From Date"],
+        chunksize=chunksize,
+    ):
+        grouped = chunk[columns].groupby(custom_dates(chunk["From Date"]))
+        chunk_sums, chunk_counts = grouped.sum(), grouped.count()
+        if sums is None:
+            sums, counts = chunk_sums, chunk_counts
+        else:
+            # Days spanning two chunks are summed; new days are appended
+            sums = sums.add(chunk_sums, fill_value=0)
+            counts = counts.add(chunk_counts, fill_value=0)
+
+    if sums is None:
+        # No readings at all
+        sums = pd.DataFrame(columns=columns, dtype=np.float64)
+        counts = pd.DataFrame(columns=columns, dtype=np.int64)
+
+    sums = sums.sort_index()
+    counts = counts.sort_index().astype(np.int64)
+    sums.index.name = counts.index.name = "custom_date"
+    return sums / counts.where(counts > 0), counts
+
+
+def aqi_from_daily(daily_means, daily_counts):
+    """
+    Calculate sub-indices and the overall AQI from daily aggregates
+
+    Parameters:
+    daily_means: Daily mean of each pollutant column, indexed by custom_date
+    daily_counts: Daily number of readings of each pollutant column
+
+    Returns:
+    pd.DataFrame: Daily means, sub-indices and AQI of the valid days
+    """
+    available_columns = daily_means.columns.tolist()
+    daily_averages = daily_means.round(2).reset_index()
+
     # Filter for days with at least 16 hours of data for each pollutant
     valid_days = daily_counts[daily_counts >= 16].dropna().index
 
@@ -148,74 +303,26 @@ def calculate_aqi(df):
     daily_averages = daily_averages[daily_averages["custom_date"].isin(valid_days)]
 
     # Calculate sub-indices for each available pollutant
-    for pollutant, column_name in column_mapping.items():
+    for pollutant, column_name in COLUMN_MAPPING.items():
         if column_name not in available_columns:
             continue
+        daily_averages[f"{pollutant}_SubIndex"] = sub_indices(
+            pollutant, daily_averages[column_name].to_numpy(dtype=np.float64)
+        )
 
-        # Create sub-index column name
-        sub_index_col = f"{pollutant}_SubIndex"
-        daily_averages[sub_index_col] = np.nan
-
-        # Calculate sub-index for each reading
-        for idx, row in daily_averages.iterrows():
-            reading = row[column_name]
-            if pd.isna(reading):
-                continue
-
-            # Find appropriate category based on reading
-            prev_upper = 0
-            for category, (lower, upper) in BREAKPOINTS[pollutant].items():
-                if lower <= reading <= upper:
-                    # Map AQI categories to ranges
-                    aqi_ranges = {
-                        "Good": (0, 50),
-                        "Satisfactory": (51, 100),
-                        "Moderately polluted": (101, 200),
-                        "Poor": (201, 300),
-                        "Very poor": (301, 400),
-                        "Severe": (401, 500),
-                    }
-
-                    daily_averages.at[idx, sub_index_col] = calculate_sub_index(
-                        reading,
-                        prev_upper,
-                        lower,
-                        upper,
-                        aqi_ranges[category][0],
-                        aqi_ranges[category][1],
-                    )
-                    break
-                prev_upper = upper
-
-    # Calculate overall AQI (worst sub-index) only if requirements are met
+    # Calculate overall AQI (worst sub-index) only if requirements are met:
+    # at least 3 pollutants, one of them PM2.5 or PM10 when PM data exists
     sub_index_columns = [
         col for col in daily_averages.columns if col.endswith("_SubIndex")
     ]
-    daily_averages["AQI"] = np.nan
-
-    for idx in daily_averages.index:
-        # Get non-null sub-indices for this row
-        valid_indices = [
-            col for col in sub_index_columns if not pd.isna(daily_averages.at[idx, col])
-        ]
-
-        # Check if either PM2.5 or PM10 is present (if they exist in the data)
-        has_pm = (
-            any(idx in valid_indices for idx in ["PM2.5_SubIndex", "PM10_SubIndex"])
-            if any(
-                pm in sub_index_columns for pm in ["PM2.5_SubIndex", "PM10_SubIndex"]
-            )
-            else False
-        )
-
-        # Calculate AQI only if we have at least 3 pollutants and one is PM (when PM data exists)
-        if len(valid_indices) >= 3 and (
-            has_pm
-            or not any(
-                pm in sub_index_columns for pm in ["PM2.5_SubIndex", "PM10_SubIndex"]
-            )
-        ):
-            daily_averages.at[idx, "AQI"] = daily_averages.loc[idx, valid_indices].max()
+    pm_columns = [
+        col for col in ["PM2.5_SubIndex", "PM10_SubIndex"] if col in sub_index_columns
+    ]
+    present = daily_averages[sub_index_columns].notna()
+    enough = present.sum(axis=1) >= 3
+    if pm_columns:
+        enough &= present[pm_columns].any(axis=1)
+    daily_averages["AQI"] = daily_averages[sub_index_columns].max(axis=1).where(enough)
 
     return daily_averages
 
@@ -239,10 +346,140 @@ def average_and_transpose(df):
     return monthly_df
 
 
-def process_data():
-    index = pd.read_csv("projects/AQI-Data-India/data/stations_info.csv")
+def station_aqi(file_name, station_name, chunksize=None):
+    """
+    Calculate the daily AQI of one station
+
+    Runs in worker processes, so it only takes picklable arguments.
+
+    Parameters:
+    file_name: Station file name, without the .csv extension
+    station_name: Name of the station, used for the series name
+    chunksize: Read the file this many rows at a time instead of all at once
+
+    Returns:
+    pd.Series: Daily AQI indexed by custom_date, named AQI_<station name>
+    """
+    path = os.path.join(DATA_DIR, f"{file_name}.csv")
+    if chunksize:
+        df = aqi_from_daily(*stream_daily_aggregates(path, chunksize))
+    else:
+        df = calculate_aqi(pd.read_csv(path, parse_dates=["From Date", "To Date"]))
+    return df.set_index("custom_date")["AQI"].rename(f"AQI_{station_name}")
+
+
+def file_hash(path):
+    """
+    Calculate the SHA-256 of a file's contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path, write):
+    """
+    Write a file through a temporary file so readers never see it half written
+
+    Parameters:
+    path: File to write
+    write: Function writing to the path it is given
+    """
+    temp_path = f"{path}.tmp"
+    write(temp_path)
+    os.replace(temp_path, path)
+
+
+def write_json(path, data):
+    """
+    Write data as JSON, atomically
+    """
+
+    def write(temp_path):
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+
+    write_atomic(path, write)
+
+
+def cached_station_aqi(file_name):
+    """
+    Look up the cached daily AQI of a station
+
+    A station is reused if its file has the size and modification time it
+    had when its AQI was cached, or failing that the same content hash, and
+    the pipeline version is unchanged.
+
+    Parameters:
+    file_name: Station file name, without the .csv extension
+
+    Returns:
+    tuple: (cached pd.Series or None, fingerprint of the station file)
+    """
+    path = os.path.join(DATA_DIR, f"{file_name}.csv")
+    meta_path = os.path.join(CACHE_DIR, f"{file_name}.json")
+    series_path = os.path.join(CACHE_DIR, f"{file_name}.pkl")
+    stat = os.stat(path)
+
+    try:
+        with open(meta_path, "r") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    usable = (
+        meta.get("version") == PIPELINE_VERSION and meta.get("size") == stat.st_size
+    )
+
+    fingerprint = meta
+    if not (usable and meta.get("mtime_ns") == stat.st_mtime_ns):
+        fingerprint = {
+            "version": PIPELINE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": file_hash(path),
+        }
+        if not (usable and meta.get("sha256") == fingerprint["sha256"]):
+            return None, fingerprint
+
+    try:
+        series = pd.read_pickle(series_path)
+    except Exception:
+        return None, fingerprint
+    if fingerprint is not meta:
+        # Touched but unchanged: remember the new modification time
+        write_json(meta_path, fingerprint)
+    return series, fingerprint
+
+
+def cache_station_aqi(file_name, series, fingerprint):
+    """
+    Store the daily AQI of a station along with the fingerprint of its file
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    write_atomic(os.path.join(CACHE_DIR, f"{file_name}.pkl"), series.to_pickle)
+    write_json(os.path.join(CACHE_DIR, f"{file_name}.json"), fingerprint)
+
+
+def process_data(workers=None, chunksize=None):
+    """
+    Calculate the daily AQI of every UP station and their monthly averages
+
+    Stations whose files changed since the last run are processed in
+    parallel on a process pool, the rest are read from the cache, and their
+    daily AQI series are aligned on custom_date in a single concat.
+
+    Parameters:
+    workers: Number of worker processes (default: one per CPU)
+    chunksize: Stream station files this many rows at a time, bounding
+        memory by the chunk size instead of the file size
+
+    Returns:
+    pd.DataFrame: Monthly AQI per station, stations as rows
+    """
+    index = pd.read_csv(os.path.join(DATA_DIR, "stations_info.csv"))
     # file_name,state,city,agency,station_location,start_month,start_month_num,start_year
-    df_list = []
     station_names = {}  # Dictionary to store station name mappings
 
     for idx, row in index.iterrows():
@@ -255,30 +492,33 @@ def process_data():
         station_name = f"{row['city']}, {row['state']} ({row['station_location']})"
         station_names[file_name] = station_name
 
-        print(f"Processing {file_name} ({station_name})")
-        df = pd.read_csv(
-            f"projects/AQI-Data-India/data/{file_name}.csv",
-            parse_dates=["From Date", "To Date"],
-        )
-        df = calculate_aqi(df)
-        df_list.append(df)
-
-    # Extract AQI columns from each dataframe and combine
-    aqi_dfs = []
-    for i, df in enumerate(df_list):
-        file_name = list(station_names.keys())[i]
-        station_name = station_names[file_name]
-        aqi_df = df[["custom_date", "AQI"]].copy()
-        aqi_df = aqi_df.rename(columns={"AQI": f"AQI_{station_name}"})
-        aqi_dfs.append(aqi_df)
-
-    # Combine all AQI data
-    df = aqi_dfs[0]
-    for aqi_df in aqi_dfs[1:]:
-        df = pd.merge(df, aqi_df, on="custom_date", how="outer")
-
-    # Set date as index
-    df = df.set_index("custom_date")
+    aqi_series = {}
+    fingerprints = {}
+    for file_name, station_name in station_names.items():
+        series, fingerprints[file_name] = cached_station_aqi(file_name)
+        if series is not None:
+            aqi_series[file_name] = series.rename(f"AQI_{station_name}")
+
+    changed = [name for name in station_names if name not in aqi_series]
+    print(f"Reusing {len(aqi_series)} cached stations, processing {len(changed)}")
+    if changed:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {}
+            for file_name in changed:
+                station_name = station_names[file_name]
+                print(f"Processing {file_name} ({station_name})")
+                futures[file_name] = pool.submit(
+                    station_aqi, file_name, station_name, chunksize
+                )
+            for file_name, future in futures.items():
+                aqi_series[file_name] = future.result()
+                cache_station_aqi(
+                    file_name, aqi_series[file_name], fingerprints[file_name]
+                )
+
+    # Combine all AQI data, with dates as the index
+    df = pd.concat([aqi_series[name] for name in station_names], axis=1).sort_index()
+    df.index.name = "custom_date"
 
     df.to_csv("UP.csv")
 
@@ -298,9 +538,13 @@ def process_data():
     return df
 
 
+# Monthly AQI of the UP stations, as written by process_data
+register_dataset("aqi/UP", ["UP2.csv"], lambda: pd.read_csv("UP2.csv", index_col=0))
+
+
 FONT: str = "./assets/fonts/Kelvinch-Bold.otf"
 if __name__ == "__main__":
-    data = pd.read_csv("UP2.csv", index_col=0)
+    data = open_dataset("aqi/UP").to_frame()
     theme = GraphTheme()
     layout = LayoutConfig()
     app = PyGamerExt((layout.width, layout.height))
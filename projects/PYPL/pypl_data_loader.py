@@ -1,7 +1,24 @@
+import ast
+import functools
 import json
+import re
+import numpy as np
 import pandas as pd
 import os
-import warnings
+from src.datasets import register_dataset
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Strings are matched first so that "//" inside a quoted name is kept; any
+# other "//" starts a comment, such as the "// begin section" markers
+TOKEN_RE = re.compile(r"""('(?:\\.|[^'\\])*'|"(?:\\.|[^"\\])*")|//[^\n]*""")
+GRAPH_DATA_RE = re.compile(r"\bgraphData\s*=\s*(\[.*\])\s*;", re.DOTALL)
+DATE_RE = re.compile(r"new Date\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)\s*\)")
+
+
+def resolve_path(path):
+    """Resolve a data path; relative paths are relative to projects/PYPL."""
+    return path if os.path.isabs(path) else os.path.join(DATA_DIR, path)
 
 
 def json_to_arr(file):
@@ -9,42 +26,89 @@ def json_to_arr(file):
         return json.load(f)
 
 
-def arr_to_df(data):
-    return pd.DataFrame(
-        [i[1:] for i in data[1:]], index=[i[0] for i in data[1:]], columns=data[0][1:]
-    )
+def js_to_arr(file):
+    """
+    Parse the graphData array of a PYPL .js file.
+
+    Comments (including the "// begin section" / "// end section" markers)
+    are stripped and each new Date(year, month, day) becomes a tuple, which
+    leaves a Python literal.
+    """
+    with open(file, "r", encoding="utf-8") as f:
+        content = f.read()
+    content = TOKEN_RE.sub(lambda match: match.group(1) or "", content)
+    match = GRAPH_DATA_RE.search(content)
+    if match is None:
+        raise ValueError(f"No graphData found in {file}")
+    return ast.literal_eval(DATE_RE.sub(r"(\1, \2, \3)", match.group(1)))
+
+
+def js_months(dates):
+    """Month of each JavaScript date tuple (months count from 0)."""
+    dates = np.array(dates, dtype=np.int64)
+    years = dates[:, 0] - 1970
+    return (years * 12 + dates[:, 1]).astype("datetime64[M]")
+
+
+def json_months(dates):
+    """
+    Month of each date in a .json export.
+
+    The exports hold UTC timestamps; their month is taken in UTC, as it was
+    when they were read with pd.to_datetime(...).dt.to_period("M").
+    """
+    timestamps = pd.to_datetime(pd.Series(dates), utc=True).dt.tz_localize(None)
+    return timestamps.to_numpy().astype("datetime64[M]")
 
 
 def load_data(path):
-    os.chdir("./projects/PYPL")
-    data = json_to_arr(path)
-    os.chdir("../../")
-    df = arr_to_df(data)
-    df = df.transpose()
-    df = df * 100
-
-    # Convert column names to dates
-    colname = df.columns.to_series()
-    dates = pd.to_datetime(colname)
-
-    # Suppress the timezone warning since it's intended behavior
-    with warnings.catch_warnings():
-        warnings.filterwarnings(
-            "ignore",
-            message="Converting to PeriodArray/Index representation will drop timezone information",
-        )
-        dates = dates.dt.to_period("M").dt.to_timestamp()
-
-    df.columns = dates
-
-    # Sort columns by date and keep only the last occurrence for duplicate months
-    df = df.loc[:, ~df.columns.duplicated(keep="last")]
+    """
+    Load a PYPL dataset as a DataFrame of shares in percent.
+
+    Accepts the original .js files or their .json exports. Nothing global is
+    touched, so several datasets can be loaded from different threads.
+
+    Args:
+        path: Path to a .js or .json file, absolute or relative to projects/PYPL
+
+    Returns:
+        DataFrame with one row per entity and one "MMM YYYY" column per month
+    """
+    path = resolve_path(path)
+    if path.endswith(".js"):
+        data = js_to_arr(path)
+        months = js_months([row[0] for row in data[1:]])
+    else:
+        data = json_to_arr(path)
+        months = json_months([row[0] for row in data[1:]])
+
+    values = np.array([row[1:] for row in data[1:]], dtype=np.float64).T * 100
+
+    # Keep only the last occurrence for duplicate months
+    keep = ~pd.Index(months).duplicated(keep="last")
 
     # Format the dates as "MMM YYYY"
-    datesstr = df.columns.strftime("%b %Y")
-    df.columns = datesstr
+    columns = pd.DatetimeIndex(months[keep]).strftime("%b %Y")
+
+    return pd.DataFrame(values[:, keep], index=data[0][1:], columns=columns)
+
+
+# Datasets and regions published by PYPL, one .js file each
+DATASETS = ["DB", "IDE", "ODE", "PYPL"]
+REGIONS = ["All", "IN"]
+
+
+def register_datasets():
+    """Register every dataset/region as "pypl/<dataset>/<region>"."""
+    for dataset in DATASETS:
+        for region in REGIONS:
+            path = resolve_path(f"{dataset}/{region}.js")
+            register_dataset(
+                f"pypl/{dataset}/{region}", [path], functools.partial(load_data, path)
+            )
+
 
-    return df
+register_datasets()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+import os
+import tempfile
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def header_image_path(app_id: str, header_image_url: str, images_dir: str) -> str:
+    """Get the cache file for a game's header image.
+
+    Args:
+        app_id: Steam app id
+        header_image_url: URL of the header image
+        images_dir: Directory holding the downloaded images
+
+    Returns:
+        Path named after the app id, with the URL's extension (default .jpg)
+    """
+    extension = os.path.splitext(urllib.parse.urlparse(header_image_url).path)[1]
+    return os.path.join(images_dir, f"{app_id}{extension or '.jpg'}")
+
+
+def make_session(pool_size: int, retries: int) -> requests.Session:
+    """Create a keep-alive session that retries failed requests.
+
+    Args:
+        pool_size: Connections kept open per host
+        retries: Retries for connection errors and 429/5xx responses
+
+    Returns:
+        Configured requests session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def download_file(
+    session: requests.Session, url: str, filename: str, timeout: float
+) -> None:
+    """Download a URL to a file atomically.
+
+    The body is streamed to a temporary file in the same directory and
+    renamed over the target only once complete, so an interrupted download
+    never leaves a partial image behind.
+
+    Raises:
+        requests.RequestException: If the download failed
+    """
+    with session.get(url, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        fd, temp_path = tempfile.mkstemp(
+            prefix=".download-", dir=os.path.dirname(filename)
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    f.write(chunk)
+            os.replace(temp_path, filename)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+
+def download_header_images(
+    images: list[tuple[str, str]],
+    images_dir: str,
+    workers: int = 8,
+    retries: int = 3,
+    timeout: float = 10,
+) -> list[str]:
+    """Download every missing header image concurrently.
+
+    Args:
+        images: List of (app_id, header_image_url) tuples
+        images_dir: Directory holding the downloaded images
+        workers: Maximum number of downloads in flight
+        retries: Retries per image for connection errors and 429/5xx responses
+        timeout: Connect/read timeout in seconds per request
+
+    Returns:
+        Image paths in the order of ``images``; failed downloads are reported
+        and their paths won't exist
+    """
+    os.makedirs(images_dir, exist_ok=True)
+    paths = [header_image_path(app_id, url, images_dir) for app_id, url in images]
+    missing = [
+        (app_id, url, path)
+        for (app_id, url), path in zip(images, paths)
+        if not os.path.exists(path)
+    ]
+    if not missing:
+        return paths
+
+    with make_session(workers, retries) as session:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(download_file, session, url, path, timeout): app_id
+                for app_id, url, path in missing
+            }
+            for future, app_id in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error downloading image for app_id {app_id}: {e}")
+    return paths
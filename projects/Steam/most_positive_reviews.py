@@ -1,125 +1,80 @@
 from src.pg_app import PgApp
 from src.graph import Graph, GraphConfig
 from src.color import Color
+from projects.Steam.steam_data_loader import load_table
+from projects.Steam.header_images import download_header_images
+from src.contact_sheet import render_contact_sheet
+from src.datasets import open_dataset, register_dataset
+import functools
+import numpy as np
 import pandas as pd
 import os
-import requests
-import urllib.parse
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "steam-insights")
 
 
 def download_header_image(app_id, header_image_url, current_dir):
-    # Create header_images directory if it doesn't exist
-    header_images_dir = os.path.join(current_dir, "steam-insights/header_images")
-    os.makedirs(header_images_dir, exist_ok=True)
+    images_dir = os.path.join(current_dir, "steam-insights/header_images")
+    return download_header_images([(app_id, header_image_url)], images_dir)[0]
 
-    # Get file extension from URL
-    parsed_url = urllib.parse.urlparse(header_image_url)
-    extension = os.path.splitext(parsed_url.path)[1]
-    if not extension:
-        extension = ".jpg"  # Default to jpg if no extension found
 
-    # Create filename
-    filename = os.path.join(header_images_dir, f"{app_id}{extension}")
+def top_positive_reviews(data_dir, count=10):
+    """
+    Build the games with the most positive reviews as a one-column dataset
 
-    # Check if file already exists (caching)
-    if not os.path.exists(filename):
-        try:
-            response = requests.get(header_image_url)
-            response.raise_for_status()
-            with open(filename, "wb") as f:
-                f.write(response.content)
-        except Exception as e:
-            print(f"Error downloading image for app_id {app_id}: {e}")
+    The app ids and header image URLs of the games are kept in attrs.
+    """
+    reviews = load_table(data_dir, "reviews", ["app_id", "positive"])
+    games = load_table(data_dir, "games", ["app_id", "name"])
+    promotional = load_table(data_dir, "promotional", ["app_id", "header_image"])
 
-    return filename
+    # Games with the most positive reviews (missing counts sort last)
+    positive = reviews.numeric("positive")
+    review_app_ids = reviews.strings("app_id")
+    top_rows = np.argsort(-positive, kind="stable")[:count]
+    app_ids = [review_app_ids[row] for row in top_rows]
 
+    df = pd.DataFrame(
+        {"positive": [int(positive[row]) for row in top_rows]},
+        index=[games.lookup("name", app_id) for app_id in app_ids],
+    )
+    df.attrs["app_ids"] = app_ids
+    df.attrs["header_images"] = [
+        promotional.lookup("header_image", app_id) for app_id in app_ids
+    ]
+    return df
 
-def main():
-    # Get current directory
-    current_dir = os.path.dirname(os.path.abspath(__file__))
 
-    df = pd.read_csv(
-        os.path.join(current_dir, "steam-insights/reviews.csv"),
-        on_bad_lines="skip",
-        na_values=["\\N", "N"],
-        dtype={
-            "app_id": str,
-            "review_score": "Int64",
-            "review_score_description": str,
-            "positive": "Int64",
-            "negative": "Int64",
-            "total": "Int64",
-            "metacritic_score": str,
-            "reviews": str,
-            "recommendations": str,
-            "steamspy_user_score": str,
-            "steamspy_score_rank": str,
-            "steamspy_positive": str,
-            "steamspy_negative": str,
-        },
-        encoding="utf-8",
-        encoding_errors="ignore",
-        quoting=1,  # QUOTE_ALL to handle embedded quotes and HTML
-        escapechar="\\",  # Add escape character for embedded quotes
-    )
-    df["positive"] = pd.to_numeric(df["positive"], errors="coerce")
-    df = df.sort_values("positive", ascending=False)
-    id_positive_pair = list(
-        zip(
-            df["app_id"].head(10).astype(str),
-            df["positive"].head(10).astype(int),
-        )
-    )
-    k_v_pair = []
-    games_df = pd.read_csv(
-        os.path.join(current_dir, "steam-insights/games.csv"),
-        on_bad_lines="skip",
-        dtype={
-            "app_id": str,
-            "name": str,
-            "release_date": str,
-            "is_free": str,
-            "price_overview": str,
-            "languages": str,
-            "type": str,
-        },
-        encoding="utf-8",
-        encoding_errors="ignore",
-        quoting=1,
-        escapechar="\\",
-    )
+register_dataset(
+    "steam/most_positive_reviews",
+    [
+        os.path.join(DATA_DIR, f"{table}.csv")
+        for table in ("reviews", "games", "promotional")
+    ],
+    functools.partial(top_positive_reviews, DATA_DIR),
+)
 
-    promotional_df = pd.read_csv(
-        os.path.join(current_dir, "steam-insights/promotional.csv"),
-        on_bad_lines="skip",
-        dtype={
-            "app_id": str,
-            "header_image": str,
-            "background_image": str,
-            "screenshots": str,
-            "movies": str,
-        },
-        encoding="utf-8",
-        encoding_errors="ignore",
-        quoting=1,
-        escapechar="\\",
-    )
 
-    image_paths = []
-    for i in range(len(id_positive_pair)):
-        app_id = id_positive_pair[i][0]
-        name = games_df[games_df["app_id"] == app_id]["name"].values[0]
+def main(contact_sheet=None):
+    """
+    Render the most positive reviews chart
 
-        # Get and download header image
-        header_image_url = promotional_df[promotional_df["app_id"] == app_id][
-            "header_image"
-        ].values[0]
-        image_path = download_header_image(app_id, header_image_url, current_dir)
-        image_paths.append(image_path)
+    Parameters:
+        contact_sheet: Path of a PNG to render the final frame to instead of
+            playing and recording the animation
+    """
+    dataset = open_dataset("steam/most_positive_reviews")
+    k_v_pair = [
+        (name, int(value)) for name, value in zip(dataset.labels, dataset.values[:, 0])
+    ]
 
-        k_v_pair.append((name, id_positive_pair[i][1]))
+    # Download the missing header images all at once
+    image_paths = download_header_images(
+        list(zip(dataset.attrs["app_ids"], dataset.attrs["header_images"])),
+        os.path.join(DATA_DIR, "header_images"),
+    )
 
-    pgapp = PgApp((1920, 1080))
+    pgapp = PgApp((1920, 1080), headless=contact_sheet is not None)
     config = GraphConfig(
         header_font="./assets/fonts/Arial.ttf",
         header_font_size=40,
@@ -149,4 +104,7 @@ def main():
         image_paths=image_paths,
     )
     graph = Graph(pgapp=pgapp, data=k_v_pair, header_height=100, config=config)
-    graph.run()
+    if contact_sheet:
+        print(render_contact_sheet(graph, pgapp, contact_sheet))
+    else:
+        graph.run()
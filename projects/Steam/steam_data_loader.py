@@ -0,0 +1,232 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# Bump when the cache layout changes so old caches are rebuilt
+CACHE_VERSION = 1
+
+# Options the steam-insights CSVs need: quoted fields with embedded quotes,
+# HTML and backslash escapes, plus the odd malformed line
+CSV_OPTIONS = {
+    "on_bad_lines": "skip",
+    "encoding": "utf-8",
+    "encoding_errors": "ignore",
+    "quoting": 1,  # QUOTE_ALL to handle embedded quotes and HTML
+    "escapechar": "\\",  # Escape character for embedded quotes
+}
+
+# Column types of each table; only the columns a caller asks for are parsed
+TABLES = {
+    "reviews": {
+        "columns": {
+            "app_id": str,
+            "review_score": "Int64",
+            "review_score_description": str,
+            "positive": "Int64",
+            "negative": "Int64",
+            "total": "Int64",
+            "metacritic_score": str,
+            "reviews": str,
+            "recommendations": str,
+            "steamspy_user_score": str,
+            "steamspy_score_rank": str,
+            "steamspy_positive": str,
+            "steamspy_negative": str,
+        },
+        "na_values": ["\\N", "N"],
+    },
+    "games": {
+        "columns": {
+            "app_id": str,
+            "name": str,
+            "release_date": str,
+            "is_free": str,
+            "price_overview": str,
+            "languages": str,
+            "type": str,
+        },
+    },
+    "promotional": {
+        "columns": {
+            "app_id": str,
+            "header_image": str,
+            "background_image": str,
+            "screenshots": str,
+            "movies": str,
+        },
+    },
+}
+
+
+class StringColumn:
+    """Strings stored as one UTF-8 blob with offsets, decoded on access."""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, valid: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+        self.valid = valid
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def __getitem__(self, row: int):
+        if not self.valid[row]:
+            return None
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return bytes(self.data[start:end]).decode("utf-8")
+
+    def to_list(self) -> list:
+        blob = bytes(self.data)
+        offsets = self.offsets.tolist()
+        return [
+            blob[offsets[row] : offsets[row + 1]].decode("utf-8") if ok else None
+            for row, ok in enumerate(self.valid.tolist())
+        ]
+
+
+class SteamTable:
+    """Typed columnar cache of one steam-insights CSV.
+
+    Each column is stored as memory-mappable ``.npy`` files: numeric columns
+    as float64 (NaN for missing) and text columns as a UTF-8 blob plus
+    offsets. Columns are converted from the CSV the first time they are
+    requested and whenever the CSV changes.
+    """
+
+    def __init__(self, csv_path: str, cache_dir: str, name: str) -> None:
+        """Open a table's cache.
+
+        Args:
+            csv_path: Path to the source CSV
+            cache_dir: Directory holding the cached columns of all tables
+            name: Table name, a key of TABLES
+        """
+        self.csv_path = csv_path
+        self.name = name
+        self.spec = TABLES[name]
+        self.directory = os.path.join(cache_dir, name)
+        self.meta_path = os.path.join(self.directory, "meta.json")
+        self.meta = self._load_meta()
+        self.index_cache = {}
+
+    def _fingerprint(self) -> dict:
+        stat = os.stat(self.csv_path)
+        return {
+            "version": CACHE_VERSION,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+        }
+
+    def _load_meta(self) -> dict:
+        fingerprint = self._fingerprint()
+        try:
+            with open(self.meta_path, "r") as f:
+                meta = json.load(f)
+            if meta["source"] == fingerprint:
+                return meta
+        except (OSError, ValueError, KeyError):
+            pass
+        # Missing or stale: start over
+        return {"source": fingerprint, "columns": []}
+
+    def _path(self, column: str, part: str) -> str:
+        return os.path.join(self.directory, f"{column}.{part}.npy")
+
+    def _save(self, path: str, array: np.ndarray) -> None:
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(temp_path, path)
+
+    def _convert(self, columns: list[str]) -> None:
+        """Parse columns from the CSV and write them to the cache."""
+        types = self.spec["columns"]
+        df = pd.read_csv(
+            self.csv_path,
+            usecols=columns,
+            dtype={column: types[column] for column in columns},
+            na_values=self.spec.get("na_values"),
+            **CSV_OPTIONS,
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        for column in columns:
+            series = df[column]
+            if types[column] is str:
+                valid = series.notna().to_numpy()
+                encoded = [
+                    value.encode("utf-8") if ok else b""
+                    for value, ok in zip(series.to_numpy(), valid)
+                ]
+                offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+                np.cumsum([len(value) for value in encoded], out=offsets[1:])
+                data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+                self._save(self._path(column, "data"), data)
+                self._save(self._path(column, "offsets"), offsets)
+                self._save(self._path(column, "valid"), valid)
+            else:
+                values = pd.to_numeric(series, errors="coerce").to_numpy(
+                    dtype=np.float64, na_value=np.nan
+                )
+                self._save(self._path(column, "values"), values)
+
+        self.meta["columns"] = sorted(set(self.meta["columns"]) | set(columns))
+        temp_path = f"{self.meta_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(temp_path, self.meta_path)
+
+    def ensure(self, columns: list[str]) -> None:
+        """Convert any of the columns that aren't cached yet."""
+        missing = [column for column in columns if column not in self.meta["columns"]]
+        if missing:
+            self._convert(missing)
+
+    def numeric(self, column: str) -> np.ndarray:
+        """Get a numeric column as a memory-mapped float64 array."""
+        self.ensure([column])
+        return np.load(self._path(column, "values"), mmap_mode="r")
+
+    def strings(self, column: str) -> StringColumn:
+        """Get a text column, decoding rows only when they are accessed."""
+        self.ensure([column])
+        return StringColumn(
+            np.load(self._path(column, "data"), mmap_mode="r"),
+            np.load(self._path(column, "offsets"), mmap_mode="r"),
+            np.load(self._path(column, "valid"), mmap_mode="r"),
+        )
+
+    def index(self, column: str = "app_id") -> dict:
+        """Map each value of a column to the first row holding it."""
+        if column not in self.index_cache:
+            rows = {}
+            for row, value in enumerate(self.strings(column).to_list()):
+                rows.setdefault(value, row)
+            self.index_cache[column] = rows
+        return self.index_cache[column]
+
+    def lookup(self, column: str, key: str, key_column: str = "app_id"):
+        """Get a column's value in the first row whose key column equals key.
+
+        Raises:
+            KeyError: If no row has the key
+        """
+        return self.strings(column)[self.index(key_column)[key]]
+
+
+def load_table(data_dir: str, name: str, columns: list[str]) -> SteamTable:
+    """Open a steam-insights table with the given columns cached.
+
+    Args:
+        data_dir: Directory holding the steam-insights CSVs
+        name: Table name, e.g. "games" for games.csv
+        columns: Columns the caller needs
+
+    Returns:
+        SteamTable for the CSV
+    """
+    table = SteamTable(
+        os.path.join(data_dir, f"{name}.csv"), os.path.join(data_dir, ".cache"), name
+    )
+    table.ensure(columns)
+    return table
@@ -1,57 +1,248 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from src.color import Color
-from projects.PYPL.pypl_data_loader import load_data
+from projects.PYPL import pypl_data_loader  # registers the pypl/* datasets
+from src.datasets import open_dataset
 from src.animated_graph import PygameExtended
 from src.graph import GraphConfig
 from src.animated_graph import BarChartAnimation
+from src.contact_sheet import render_contact_sheet
 
 # see projects/PYPL
-visualization_data = load_data("./ODE/All.json")
-
-HEADER_TEXT = "Online IDE Popularity (Global)"
-RECORD_PATH = "outputs/pypl_ode_all_graph.mp4"
+DATASETS = {
+    "DB": "Database",
+    "IDE": "IDE",
+    "ODE": "Online IDE",
+    "PYPL": "Programming Language",
+}
+REGIONS = {
+    "All": ("Global", "all"),
+    "IN": ("India", "india"),
+}
 
 WINDOW_SIZE = (1920, 1080)
-app = PygameExtended(WINDOW_SIZE)
-
-# Configure visualization
-chart_config = GraphConfig(
-    header_font="./assets/fonts/Arial.ttf",
-    header_font_size=69,
-    header_text=HEADER_TEXT,
-    bar_height=40,
-    width_multiplier=100,
-    colors=[
-        Color("#f98284"),  # Red
-        Color("#ffc384"),  # Orange
-        Color("#dea38b"),  # Coral
-        Color("#e9f59d"),  # Light Green
-        Color("#fff7a0"),  # Yellow
-        Color("#b0eb93"),  # Green
-        Color("#b3e3da"),  # Teal
-        Color("#accce4"),  # Light Blue
-        Color("#b0a9e4"),  # Purple
-        Color("#feaae4"),  # Pink
-    ],
-    left_gap=250,
-    text_bar_distance=30,
-    small_text_size=30,
-    to_show=10,
-    fps=60,
-    animation_speed=0.1,
-    bg_color=Color("#28282e"),
-    header_bg_color=Color("#6c5671"),
-    header_text_color=Color("#ffffff"),
-    value_gap=10,
-    record_path=RECORD_PATH,
-    wait_time_after_completion=3,
-    value_prepost=("~", "%"),
-)
-
-# Create and run visualization
-chart = BarChartAnimation(
-    pygame_app=app,
-    chart_data=visualization_data,
-    header_height=100,
-    chart_config=chart_config,
-)
-chart.run()
+
+
+def chart_config(header_text: str, record_path: str) -> GraphConfig:
+    """Build the chart configuration shared by all PYPL videos."""
+    return GraphConfig(
+        header_font="./assets/fonts/Arial.ttf",
+        header_font_size=69,
+        header_text=header_text,
+        bar_height=40,
+        width_multiplier=100,
+        colors=[
+            Color("#f98284"),  # Red
+            Color("#ffc384"),  # Orange
+            Color("#dea38b"),  # Coral
+            Color("#e9f59d"),  # Light Green
+            Color("#fff7a0"),  # Yellow
+            Color("#b0eb93"),  # Green
+            Color("#b3e3da"),  # Teal
+            Color("#accce4"),  # Light Blue
+            Color("#b0a9e4"),  # Purple
+            Color("#feaae4"),  # Pink
+        ],
+        left_gap=250,
+        text_bar_distance=30,
+        small_text_size=30,
+        to_show=10,
+        fps=60,
+        animation_speed=0.1,
+        bg_color=Color("#28282e"),
+        header_bg_color=Color("#6c5671"),
+        header_text_color=Color("#ffffff"),
+        value_gap=10,
+        record_path=record_path,
+        wait_time_after_completion=3,
+        value_prepost=("~", "%"),
+    )
+
+
+def build_chart(app: PygameExtended, job: str, output_dir: str) -> BarChartAnimation:
+    """Build the chart of one dataset/region job.
+
+    Args:
+        app: Application to draw on
+        job: Dataset and region as "<dataset>/<region>", e.g. "ODE/All"
+        output_dir: Directory for the video
+
+    Returns:
+        The chart, recording to its video in output_dir
+    """
+    dataset, region = job.split("/")
+    region_name, region_slug = REGIONS[region]
+    header_text = f"{DATASETS[dataset]} Popularity ({region_name})"
+    record_path = os.path.join(
+        output_dir, f"pypl_{dataset.lower()}_{region_slug}_graph.mp4"
+    )
+    os.makedirs(output_dir, exist_ok=True)
+
+    return BarChartAnimation(
+        pygame_app=app,
+        chart_data=open_dataset(f"pypl/{dataset}/{region}").to_frame(),
+        header_height=100,
+        chart_config=chart_config(header_text, record_path),
+    )
+
+
+def render_job(
+    job: str,
+    headless: bool = True,
+    encoder: str = "mp4v",
+    output_dir: str = "outputs",
+    segment_frames: int = 0,
+) -> dict:
+    """Render one dataset/region video.
+
+    Args:
+        job: Dataset and region as "<dataset>/<region>", e.g. "ODE/All"
+        headless: Render without a window as fast as possible
+        encoder: Recorder encoder ("mp4v" or "libx264")
+        output_dir: Directory for the video
+        segment_frames: Record in resumable segments of this many frames
+
+    Returns:
+        Dict with the job, output path, frame count, wall time and frames/sec
+    """
+    start = time.perf_counter()
+    app = PygameExtended(
+        WINDOW_SIZE, headless=headless, encoder=encoder, segment_frames=segment_frames
+    )
+    chart = build_chart(app, job, output_dir)
+    chart.run()
+    wall_time = time.perf_counter() - start
+
+    return {
+        "job": job,
+        "output": chart.config.record_path,
+        "frames": app.frame_index,
+        "wall_time": round(wall_time, 3),
+        "fps": round(app.frame_index / wall_time, 2),
+    }
+
+
+def render_sheet(job: str, every: int = 1, output_dir: str = "outputs") -> str:
+    """Render a contact sheet of one job's timepoints instead of its video.
+
+    Args:
+        job: Dataset and region as "<dataset>/<region>", e.g. "ODE/All"
+        every: Step between the timepoints shown
+        output_dir: Directory for the sheet
+
+    Returns:
+        Path of the PNG, named after the video
+    """
+    app = PygameExtended(WINDOW_SIZE, headless=True)
+    chart = build_chart(app, job, output_dir)
+    path = os.path.splitext(chart.config.record_path)[0] + "_sheet.png"
+    return render_contact_sheet(chart, app, path, every)
+
+
+def run_batch(
+    jobs: list[str],
+    workers: int,
+    encoder: str,
+    output_dir: str,
+    segment_frames: int = 0,
+) -> list:
+    """Render several jobs headless on a process pool.
+
+    Args:
+        jobs: List of "<dataset>/<region>" jobs
+        workers: Number of worker processes
+        encoder: Recorder encoder ("mp4v" or "libx264")
+        output_dir: Directory for the videos
+        segment_frames: Record in resumable segments of this many frames
+
+    Returns:
+        List of per-job summaries in job order
+    """
+    # Spawned workers don't inherit the parent's SDL state
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = [
+            pool.submit(render_job, job, True, encoder, output_dir, segment_frames)
+            for job in jobs
+        ]
+        return [future.result() for future in futures]
+
+
+def main() -> None:
+    all_jobs = [f"{dataset}/{region}" for dataset in DATASETS for region in REGIONS]
+    parser = argparse.ArgumentParser(description="Render PYPL popularity videos.")
+    parser.add_argument(
+        "jobs",
+        nargs="*",
+        default=["ODE/All"],
+        help=f"Jobs as <dataset>/<region> (default: ODE/All), from {', '.join(all_jobs)}",
+    )
+    parser.add_argument("--all", action="store_true", help="Render every job")
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="Worker processes"
+    )
+    parser.add_argument("--encoder", choices=["mp4v", "libx264"], default="mp4v")
+    parser.add_argument("--output-dir", default="outputs")
+    parser.add_argument(
+        "--headless", action="store_true", help="Render a single job without a window"
+    )
+    parser.add_argument("--summary", help="Write the per-job summary to a JSON file")
+    parser.add_argument(
+        "--segment-frames",
+        type=int,
+        default=0,
+        help="Record in segments of this many frames; an interrupted render "
+        "resumes from its last finished segment",
+    )
+    parser.add_argument(
+        "--contact-sheet",
+        action="store_true",
+        help="Render a PNG of the chart's timepoints instead of the video",
+    )
+    parser.add_argument(
+        "--every", type=int, default=1, help="Show every Nth timepoint on the sheet"
+    )
+    args = parser.parse_args()
+
+    jobs = all_jobs if args.all else args.jobs
+    for job in jobs:
+        if job not in all_jobs:
+            parser.error(f"unknown job {job!r}")
+
+    if args.contact_sheet:
+        for job in jobs:
+            print(f"{job:<10} {render_sheet(job, args.every, args.output_dir)}")
+        return
+
+    if len(jobs) == 1:
+        summary = [
+            render_job(
+                jobs[0],
+                args.headless,
+                args.encoder,
+                args.output_dir,
+                args.segment_frames,
+            )
+        ]
+    else:
+        summary = run_batch(
+            jobs, args.workers, args.encoder, args.output_dir, args.segment_frames
+        )
+
+    for result in summary:
+        print(
+            f"{result['job']:<10} {result['frames']:>6} frames "
+            f"{result['wall_time']:>9.2f}s {result['fps']:>8.2f} fps  {result['output']}"
+        )
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from typing import Iterator, Tuple
+from typing import Iterator, Optional, Tuple
 import pygame
 import numpy as np
 import pandas as pd
@@ -6,31 +6,37 @@ import time
 from .color import Color
 from .pg_app import PgApp
 from .super_rect import SuperRect
-from .graph import GraphConfig
+from .graph import GraphConfig, chart_fingerprint
+from .label_cache import LabelCache
+from .timeline import BarTimeline
 
 
 class PygameExtended(PgApp):
     """Extended Pygame application with enhanced drawing capabilities."""
 
-    def __init__(self, window_dimensions: tuple[int, int]) -> None:
-        super().__init__(window_dimensions)
+    def __init__(
+        self,
+        window_dimensions: tuple[int, int],
+        headless: bool = False,
+        encoder: str = "mp4v",
+        segment_frames: int = 0,
+    ) -> None:
+        super().__init__(window_dimensions, headless, encoder, segment_frames)
 
     def render_bar_labels(
-        self, visualization_data: pd.DataFrame, visibility_flags: list[bool]
+        self,
+        labels: list[tuple[pygame.surface.Surface, pygame.rect.Rect]],
+        visibility_flags: list[bool],
     ) -> None:
         """Draw text labels for bars.
 
         Args:
-            visualization_data: DataFrame containing text renders and positions
+            labels: List of (text surface, position) tuples in drawing order
             visibility_flags: List of booleans controlling label visibility
         """
-        for text_surface, text_position, is_visible in zip(
-            visualization_data["text_render"],
-            visualization_data["text_rect"],
-            visibility_flags,
-        ):
+        for (text_surface, text_position), is_visible in zip(labels, visibility_flags):
             if is_visible:
-                self.screen.blit(text_surface, text_position)
+                self.display.blit(text_surface, text_position)
 
     def render_timestamp(
         self, timestamp_data: tuple[pygame.surface.Surface, pygame.rect.Rect]
@@ -40,7 +46,7 @@ class PygameExtended(PgApp):
         Args:
             timestamp_data: Tuple of timestamp surface and position
         """
-        self.screen.blit(timestamp_data[0], timestamp_data[1])
+        self.display.blit(timestamp_data[0], timestamp_data[1])
 
 
 class AnimatedBar(SuperRect):
@@ -151,6 +157,7 @@ class BarChartAnimation:
 
         # Initialize components
         self.bars = []
+        self.label_caches: dict[tuple, LabelCache] = {}
         self._initialize_header(
             chart_config.header_font,
             chart_config.header_font_size,
@@ -168,6 +175,10 @@ class BarChartAnimation:
         self.debug_mode = False
         self.animation_complete = False
         self.completion_timestamp = None
+        self.timepoints = None
+        self.bar_state = None
+        # State of the frame on screen, to skip redrawing identical frames
+        self.drawn_state = None
 
     def _calculate_vertical_gap(self, header_height: int, config: GraphConfig) -> float:
         """Calculate vertical spacing between bars."""
@@ -222,7 +233,13 @@ class BarChartAnimation:
                 )
             )
 
-        self.chart_data["bars"] = self.bars
+        positions = np.array(
+            [self._calculate_bar_position(idx) for idx in range(self.num_bars)]
+        )
+        self.timeline = BarTimeline(
+            self.chart_data.to_numpy(dtype=float).T, positions, self.pygame_app.height
+        )
+        self.timepoint_labels = [str(column) for column in self.chart_data.columns]
 
     def _calculate_bar_position(self, index: int) -> float:
         """Calculate vertical position for a bar."""
@@ -237,19 +254,14 @@ class BarChartAnimation:
     ) -> None:
         """Initialize static bar labels."""
         self.label_font = pygame.font.Font(font_path, font_size)
-        text_surfaces = []
-        text_positions = []
+        self.bar_labels = []
 
-        for bar in self.chart_data["bars"]:
+        for bar in self.bars:
             surface = self.label_font.render(bar.title, True, Color.rgb_white())
             position = surface.get_rect()
             position.center = (position.center[0], bar.centery)
             position.right = self.margin_left - label_gap
-            text_surfaces.append(surface)
-            text_positions.append(position)
-
-        self.chart_data["text_render"] = text_surfaces
-        self.chart_data["text_rect"] = text_positions
+            self.bar_labels.append((surface, position))
 
     def animate(self, frame_duration: float) -> None:
         """Update animation state for current frame.
@@ -272,44 +284,66 @@ class BarChartAnimation:
     def _update_frame(self) -> None:
         """Update animation state for next frame."""
         self.current_frame += 1
-        self.chart_data = self.chart_data.sort_values(
-            self.chart_data.columns[self.current_frame], ascending=False
-        )
 
-        for idx, bar in enumerate(self.chart_data["bars"]):
-            current_value = self.chart_data.iloc[
-                self.chart_data.index.get_loc(bar.title), self.current_frame
-            ]
-            bar.initial_width = bar.final_width
-            bar.final_width = current_value
-            bar.initial_y = bar.final_y
-            bar.final_y = self._calculate_bar_position(idx)
+    def on_screen_bars(self) -> list[AnimatedBar]:
+        """Get the bars that are visible or moving into or out of view.
+
+        Bars outside the visible rank slots at both ends of the current
+        transition are below the bottom edge and are not animated or drawn.
+
+        Returns:
+            List of bars in their original order
+        """
+        return [self.bars[idx] for idx in self.timeline.active[self.current_frame]]
 
     def _update_bar_animations(self, frame_duration: float) -> None:
-        """Update all bar positions and sizes."""
+        """Update on-screen bar positions and sizes."""
         elapsed = self.pygame_app.time_elapsed - self.current_frame * frame_duration
-        for bar in self.chart_data["bars"]:
-            self._animate_bar_width(bar, elapsed, frame_duration)
-            self._animate_bar_position(bar, elapsed, frame_duration)
+        active = self.timeline.active[self.current_frame]
+        values, tops = self.timeline.interpolate(
+            self.current_frame, elapsed, frame_duration, active
+        )
+        widths = values * self.scale_factor
+        # Everything a frame is drawn from: the timepoint and on-screen bars
+        self.bar_state = (self.current_frame, widths, tops)
+        for idx, width, top in zip(active.tolist(), widths.tolist(), tops.tolist()):
+            bar = self.bars[idx]
+            bar.width = width
+            bar.top = top
 
-    def _animate_bar_width(
-        self, bar: AnimatedBar, elapsed: float, duration: float
-    ) -> None:
-        """Animate bar width transition."""
-        width_delta = (bar.final_width - bar.initial_width) / duration
-        bar.width = (bar.initial_width + width_delta * elapsed) * self.scale_factor
+    def update_label_positions(self) -> None:
+        """Update vertical positions of on-screen bar labels."""
+        for idx in self.timeline.active[self.current_frame].tolist():
+            self.bar_labels[idx][1].centery = self.bars[idx].centery
 
-    def _animate_bar_position(
-        self, bar: AnimatedBar, elapsed: float, duration: float
-    ) -> None:
-        """Animate bar position transition."""
-        position_delta = (bar.final_y - bar.initial_y) / duration
-        bar.top = int(bar.initial_y + position_delta * elapsed)
+    def ordered_bar_labels(
+        self,
+    ) -> tuple[list[tuple[pygame.surface.Surface, pygame.rect.Rect]], list[bool]]:
+        """Get on-screen bar labels in rank order with their visibility flags.
 
-    def update_label_positions(self) -> None:
-        """Update vertical positions of bar labels."""
-        for row in self.chart_data.itertuples():
-            row.text_rect.centery = row.bars.centery
+        Returns:
+            Tuple of (labels, visibility flags) for the current timepoint
+        """
+        order = self.timeline.label_orders[self.current_frame].tolist()
+        return (
+            [self.bar_labels[idx] for idx in order],
+            [self.bars[idx].width > 0 for idx in order],
+        )
+
+    def label_cache(self, font: pygame.font.Font, text_color: Color) -> LabelCache:
+        """Get the label cache for a font and colour, creating it on first use.
+
+        Args:
+            font: Font used for the labels
+            text_color: Label text color
+
+        Returns:
+            Shared LabelCache instance
+        """
+        key = (id(font), text_color.rgb())
+        if key not in self.label_caches:
+            self.label_caches[key] = LabelCache(font, text_color.rgb())
+        return self.label_caches[key]
 
     def create_value_labels(
         self, right_margin: int, text_color: Color
@@ -323,9 +357,11 @@ class BarChartAnimation:
         Yields:
             Tuple of (text surface, position rect, visibility flag)
         """
-        for bar in self.bars:
-            value_text = f"{self.value_format[0]}{int(bar.width // self.scale_factor)}{self.value_format[1]}"
-            surface = self.label_font.render(value_text, True, text_color.rgb())
+        labels = self.label_cache(self.label_font, text_color)
+        for bar in self.on_screen_bars():
+            surface = labels.label(
+                str(int(bar.width // self.scale_factor)), self.value_format
+            )
             position = surface.get_rect()
             position.right = bar.right - right_margin
             position.centery = bar.centery
@@ -345,8 +381,8 @@ class BarChartAnimation:
         Returns:
             Tuple of timestamp surface and position
         """
-        surface = self.header_font.render(
-            str(self.chart_data.columns[self.current_frame]), True, text_color.rgb()
+        surface = self.label_cache(self.header_font, text_color).string(
+            self.timepoint_labels[self.current_frame]
         )
         rect_position = surface.get_rect()
 
@@ -363,66 +399,212 @@ class BarChartAnimation:
             bool: True if animation is complete
         """
         self.animation_complete = self.current_frame >= self.time_points - 1
-        if self.animation_complete and not self.completion_timestamp:
-            self.completion_timestamp = time.time()
+        if self.animation_complete and self.completion_timestamp is None:
+            self.completion_timestamp = self.pygame_app.time_elapsed
         return self.animation_complete
 
-    def run(self) -> None:
-        """Run the animation loop."""
-        if self.config.record_path:
-            self.pygame_app.recorder.start_rec(self.config.fps)
+    def timepoint_schedule(self) -> np.ndarray:
+        """Timepoint a run shows at each frame until it reaches the last one.
 
-        while self.pygame_app.running:
-            self.pygame_app.t0 = time.time()
+        A run moves to the next timepoint once the clock passes its start but
+        never by more than one timepoint per frame, so each frame shows
+        min(previous + 1, timepoints started). The schedule is computed once
+        for the whole run.
+
+        Returns:
+            Array of timepoint indices, one per frame
+        """
+        if self.timepoints is None:
+            fps = self.config.fps
+            duration = self.config.animation_speed
+            last = self.time_points - 1
+            frames = np.arange(int(last * duration * fps) + last + 2)
+            times = frames / fps
+            started = np.floor(times / duration)
+            # Settle float rounding with the comparison _should_advance_frame uses
+            while True:
+                behind = duration * (started + 1) < times
+                ahead = (started > 0) & (duration * started >= times)
+                if not (behind.any() or ahead.any()):
+                    break
+                started += behind
+                started -= ahead
+            lag = np.minimum.accumulate(np.minimum(started - frames, 0))
+            timepoints = np.minimum(frames + lag, last).astype(np.int64)
+            self.timepoints = timepoints[: np.argmax(timepoints == last) + 1]
+        return self.timepoints
+
+    def timepoint_at(self, frame: int) -> int:
+        """Timepoint a run shows at a frame.
 
-            # Handle events
-            for event in pygame.event.get():
-                self.pygame_app.kill_switch(event)
+        Args:
+            frame: Frame index
+
+        Returns:
+            Index of the current timepoint
+        """
+        timepoints = self.timepoint_schedule()
+        return int(timepoints[min(frame, len(timepoints) - 1)])
+
+    def completion_frame(self) -> int:
+        """Index of the first frame that shows the last timepoint."""
+        return len(self.timepoint_schedule()) - 1
+
+    def fingerprint(self) -> str:
+        """Identify what the chart draws, so only its own recording resumes."""
+        return chart_fingerprint(
+            self.config,
+            self.frame_count(),
+            self.chart_data.to_numpy(dtype=float).tobytes(),
+            list(self.chart_data.index),
+            self.timepoint_labels,
+            self.header_rect.size,
+        )
+
+    def frame_count(self) -> int:
+        """Number of frames a run renders, including the completion hold.
 
-            # Update animation state
-            self.pygame_app.screen.fill(self.config.bg_color.rgb())
+        Returns:
+            Frame count, known before rendering
+        """
+        fps = self.config.fps
+        completed = self.completion_frame()
+        # Completion is checked after the clock advances past a frame
+        completion_time = (completed + 1) / fps
+        frames = completed + 1
+        while frames / fps - completion_time <= self.config.wait_time_after_completion:
+            frames += 1
+        return frames
+
+    def seek(self, frame: int) -> None:
+        """Move the animation and the app's clock straight to a frame.
+
+        The state matches a run that has drawn every earlier frame, so the
+        next render_frame() draws exactly the frame a run would, without
+        replaying the frames before it.
+
+        Args:
+            frame: Frame index
+        """
+        fps = self.config.fps
+        self.pygame_app.frame_index = frame
+        self.pygame_app.time_elapsed = frame / fps
+        self.pygame_app.display.invalidate()
+        self.drawn_state = None
+        self.current_frame = self.timepoint_at(frame - 1) if frame > 0 else 0
+
+        # Completion is checked after the clock advances past a frame
+        completed = self.completion_frame()
+        self.animation_complete = completed < frame
+        self.completion_timestamp = (completed + 1) / fps if completed < frame else None
+
+    def render_frame(self, frame: Optional[int] = None) -> bool:
+        """Advance the animation to the app's current time and draw the frame.
+
+        Args:
+            frame: Frame index to seek to first, for random access
+
+        Returns:
+            False if the timepoint and on-screen bars didn't change since the
+            last drawn frame, which is then still on screen and isn't drawn
+            again
+        """
+        if frame is not None:
+            self.seek(frame)
+        profiler = self.pygame_app.profiler
+        with profiler.phase("animate"):
             self.animate(self.config.animation_speed)
 
-            # Render frame
+        state = self.bar_state
+        if (
+            self.drawn_state is not None
+            and state[0] == self.drawn_state[0]
+            and np.array_equal(state[1], self.drawn_state[1])
+            and np.array_equal(state[2], self.drawn_state[2])
+        ):
+            return False
+        self.drawn_state = state
+
+        self.pygame_app.screen.fill(self.config.bg_color.rgb())
+
+        with profiler.phase("draw_bars"):
             self.pygame_app.draw_data_rects(
-                self.bars,
+                self.on_screen_bars(),
                 self.header_rect,
                 self.config.header_bg_color,
                 self.header_surface,
                 self.header_position,
             )
 
+        with profiler.phase("bar_labels"):
             self.update_label_positions()
-            self.pygame_app.render_bar_labels(
-                self.chart_data, [bar.width > 0 for bar in self.bars]
-            )
+            self.pygame_app.render_bar_labels(*self.ordered_bar_labels())
 
+        with profiler.phase("timestamp"):
+            timestamp = self.create_timestamp("BR", Color("#ffffff"), 200)
+            self.pygame_app.render_timestamp(timestamp)
+
+        # Value labels are created lazily while they are drawn
+        with profiler.phase("value_labels"):
             value_labels = self.create_value_labels(
                 self.config.value_gap, self.config.bg_color
             )
-            timestamp = self.create_timestamp("BR", Color("#ffffff"), 200)
-
-            self.pygame_app.render_timestamp(timestamp)
             self.pygame_app.draw_continuous_numbers(value_labels)
+        return True
+
+    def is_finished(self) -> bool:
+        """Check if the completion hold has elapsed.
+
+        Returns:
+            bool: True once the animation is complete and the hold is over
+        """
+        return (
+            self.check_animation_complete()
+            and self.pygame_app.time_elapsed - self.completion_timestamp
+            > self.config.wait_time_after_completion
+        )
+
+    def run(self) -> None:
+        """Run the animation loop."""
+        if self.config.record_path:
+            recorded = self.pygame_app.start_recording(
+                self.config.record_path, self.config.fps, self.fingerprint()
+            )
+            # Continue an interrupted segmented recording after its last frame
+            if recorded and recorded >= self.frame_count():
+                self.pygame_app.finish_recording()
+                return
+            if recorded:
+                self.seek(recorded)
+        if self.config.profile_path:
+            self.pygame_app.start_profiling(self.config.profile_allocations)
 
-            # Update display
-            self.pygame_app.update_display()
-            self.pygame_app.fpsClock.tick(self.config.fps)
-            self.pygame_app.time_elapsed += time.time() - self.pygame_app.t0
-
-            # Check completion
-            if self.check_animation_complete():
-                if (
-                    self.completion_timestamp
-                    and time.time() - self.completion_timestamp
-                    > self.config.wait_time_after_completion
-                ):
+        while self.pygame_app.running:
+            with self.pygame_app.profiler.frame():
+                self.pygame_app.t0 = time.time()
+
+                # Handle events
+                with self.pygame_app.profiler.phase("events"):
+                    for event in pygame.event.get():
+                        self.pygame_app.kill_switch(event)
+
+                # Identical frames are held instead of drawn and captured again
+                if self.render_frame():
+                    self.pygame_app.update_display()
+                else:
+                    self.pygame_app.hold_display()
+                self.pygame_app.advance_clock(self.config.fps)
+
+                # Check completion
+                if self.is_finished():
                     if self.config.record_path:
-                        self.pygame_app.recorder.stop_rec().save_recording(
-                            self.config.record_path
-                        )
+                        with self.pygame_app.profiler.phase("finish_recording"):
+                            self.pygame_app.finish_recording()
                     self.pygame_app.running = False
 
+        if self.config.profile_path:
+            self.pygame_app.finish_profiling(self.config.profile_path)
+
 
 if __name__ == "__main__":
     # Generate sample data
@@ -0,0 +1,257 @@
+import multiprocessing
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import pygame
+from .color import Color
+from .graph import Graph, GraphConfig, GrowthSchedule
+from .animated_graph import BarChartAnimation, PygameExtended
+from .pg_app import PgApp
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FONT = "./assets/fonts/Arial.ttf"
+COLORS = [
+    Color("#f98284"),
+    Color("#ffc384"),
+    Color("#dea38b"),
+    Color("#e9f59d"),
+    Color("#fff7a0"),
+    Color("#b0eb93"),
+    Color("#b3e3da"),
+    Color("#accce4"),
+    Color("#b0a9e4"),
+    Color("#feaae4"),
+]
+
+
+def synthetic_data(entities: int, timepoints: int, seed: int = 0) -> pd.DataFrame:
+    """Generate chart data of any size as random walks.
+
+    Every entity starts at a random value and grows by a random amount at
+    every timepoint, so ranks keep changing like in real data.
+
+    Args:
+        entities: Number of rows
+        timepoints: Number of columns
+        seed: Random seed; the same arguments always give the same data
+
+    Returns:
+        DataFrame with one row per entity and one column per timepoint
+    """
+    rng = np.random.default_rng(seed)
+    start = rng.integers(1, 11, (entities, 1))
+    steps = rng.integers(0, 10, (entities, timepoints - 1))
+    values = np.concatenate([start, steps], axis=1).cumsum(axis=1)
+
+    # Names of 3 to 9 repeated letters, made unique by their index
+    letters = rng.integers(0, 26, entities)
+    lengths = rng.integers(3, 10, entities)
+    labels = [
+        chr(97 + letter) * length + str(idx)
+        for idx, (letter, length) in enumerate(zip(letters.tolist(), lengths.tolist()))
+    ]
+    return pd.DataFrame(
+        values, index=labels, columns=[f"t{idx}" for idx in range(timepoints)]
+    )
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB, or None if unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024**2 if sys.platform == "darwin" else 1024), 1)
+
+
+def benchmark_config(to_show: int, animation_type: str, speed: float) -> GraphConfig:
+    """Build the configuration shared by every benchmark chart."""
+    return GraphConfig(
+        header_font=FONT,
+        header_font_size=69,
+        header_text="Benchmark",
+        bar_height=40,
+        width_multiplier=100,
+        colors=COLORS,
+        left_gap=250,
+        text_bar_distance=30,
+        small_text_size=30,
+        to_show=to_show,
+        fps=60,
+        animation_speed=speed,
+        bg_color=Color("#28282e"),
+        header_bg_color=Color("#6c5671"),
+        value_gap=10,
+        animation_type=animation_type,
+        wait_time_after_completion=1,
+    )
+
+
+def run_case(
+    engine: str,
+    entities: int,
+    timepoints: int = 20,
+    to_show: int = 10,
+    animation_type: str = "bottom_up",
+    max_frames: int = 600,
+    dimensions: tuple[int, int] = (1920, 1080),
+) -> dict:
+    """Benchmark one chart headless.
+
+    The chart is rendered like run() does, without recording, until it
+    finishes or ``max_frames`` frames were drawn.
+
+    Args:
+        engine: "graph" for Graph or "bar_chart" for BarChartAnimation
+        entities: Number of bars
+        timepoints: Number of timepoints (bar_chart only)
+        to_show: Number of bar slots on screen
+        animation_type: Graph animation type (graph only)
+        max_frames: Maximum number of frames to render
+        dimensions: Tuple of (width, height) for the surface
+
+    Returns:
+        Dict with the case, startup time, frames/sec, per-frame latency
+        percentiles in milliseconds and peak RSS in MiB
+    """
+    data = synthetic_data(entities, timepoints)
+
+    start = time.perf_counter()
+    if engine == "graph":
+        app = PgApp(dimensions, headless=True)
+        speed = 20 if animation_type.endswith("_flat") else 0.5
+        chart = Graph(
+            pgapp=app,
+            data=list(zip(data.index, data.iloc[:, -1].tolist())),
+            header_height=100,
+            config=benchmark_config(to_show, animation_type, speed),
+        )
+    else:
+        app = PygameExtended(dimensions, headless=True)
+        chart = BarChartAnimation(
+            pygame_app=app,
+            chart_data=data,
+            header_height=100,
+            chart_config=benchmark_config(to_show, animation_type, 0.1),
+        )
+    startup = time.perf_counter() - start
+
+    fps = chart.config.fps
+    latencies = []
+    render_start = time.perf_counter()
+    while len(latencies) < max_frames:
+        frame_start = time.perf_counter()
+        if chart.render_frame():
+            app.update_display()
+        else:
+            app.hold_display()
+        app.advance_clock(fps)
+        finished = chart.is_finished()
+        latencies.append(time.perf_counter() - frame_start)
+        if finished:
+            break
+    wall_time = time.perf_counter() - render_start
+    pygame.quit()
+
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {
+        "engine": engine,
+        "entities": entities,
+        "timepoints": timepoints if engine == "bar_chart" else 1,
+        "to_show": to_show,
+        "animation_type": animation_type if engine == "graph" else None,
+        "frames": len(latencies),
+        "startup_s": round(startup, 4),
+        "wall_time_s": round(wall_time, 4),
+        "fps": round(len(latencies) / wall_time, 2),
+        "latency_ms": {
+            "p50": round(p50, 3),
+            "p90": round(p90, 3),
+            "p99": round(p99, 3),
+            "max": round(max(latencies) * 1000, 3),
+        },
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def suite_cases(
+    entities: list[int] = (10, 100, 1000, 10_000, 100_000),
+    timepoints: list[int] = (20, 200),
+    to_show: list[int] = (10, 30),
+    animation_types: list[str] = GrowthSchedule.TYPES,
+) -> list[dict]:
+    """Build the benchmark matrix.
+
+    Graph cases cover every entity count and animation type,
+    BarChartAnimation cases every entity count, timepoint count and
+    ``to_show`` value.
+
+    Returns:
+        List of keyword arguments for run_case
+    """
+    cases = [
+        {"engine": "graph", "entities": count, "animation_type": animation_type}
+        for count in entities
+        for animation_type in animation_types
+    ]
+    cases += [
+        {
+            "engine": "bar_chart",
+            "entities": count,
+            "timepoints": points,
+            "to_show": shown,
+        }
+        for count in entities
+        for points in timepoints
+        for shown in to_show
+    ]
+    return cases
+
+
+def run_suite(cases: list[dict], max_frames: int = 600) -> dict:
+    """Run benchmark cases, each in a fresh process.
+
+    A fresh process per case keeps startup times cold and peak RSS specific
+    to the case.
+
+    Args:
+        cases: Keyword arguments for run_case
+        max_frames: Maximum number of frames per case
+
+    Returns:
+        Dict with the environment and one result per case
+    """
+    results = []
+    context = multiprocessing.get_context("spawn")
+    for case in cases:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            result = pool.submit(run_case, max_frames=max_frames, **case).result()
+        print(
+            f"{result['engine']:<10} {result['entities']:>7} entities "
+            f"{result['timepoints']:>4} tp {result['to_show']:>3} shown "
+            f"{result['animation_type'] or '':<18} {result['fps']:>9.1f} fps "
+            f"p99 {result['latency_ms']['p99']:>8.2f} ms "
+            f"startup {result['startup_s']:>7.2f}s"
+        )
+        results.append(result)
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "pygame": pygame.version.ver,
+        },
+        "max_frames": max_frames,
+        "results": results,
+    }
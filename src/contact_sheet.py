@@ -0,0 +1,131 @@
+import math
+import numpy as np
+import pygame
+from .pg_app import PgApp
+
+
+def keyframes(chart, every: int = 1) -> list[tuple[int, str]]:
+    """Pick the frames worth reviewing in a chart.
+
+    For a BarChartAnimation this is the frame at which the transition into
+    every ``every``-th column of the chart data ends, always including the
+    last column; for a Graph it is the final frame.
+
+    Args:
+        chart: Graph or BarChartAnimation
+        every: Step between the columns shown
+
+    Returns:
+        List of (frame index, caption) tuples
+    """
+    if not hasattr(chart, "timepoint_schedule"):
+        return [(chart.frame_count() - 1, "Final")]
+
+    # The chart appends a copy of the last column, which isn't reviewed
+    labels = [str(label) for label in chart.chart_data.columns[:-1]]
+    steps = list(range(0, len(labels), every))
+    if steps[-1] != len(labels) - 1:
+        steps.append(len(labels) - 1)
+
+    # A transition ends on the last frame before the next one starts
+    schedule = chart.timepoint_schedule()
+    frames = np.searchsorted(schedule, np.array(steps) + 1) - 1
+    return [(int(frame), labels[step]) for frame, step in zip(frames, steps)]
+
+
+def render_keyframes(
+    chart, app: PgApp, frames: list[int]
+) -> list[pygame.surface.Surface]:
+    """Render single frames of a chart by seeking straight to them.
+
+    Args:
+        chart: Graph or BarChartAnimation on a headless app
+        app: The chart's application
+        frames: Frame indices to render
+
+    Returns:
+        A copy of the screen for every frame
+    """
+    surfaces = []
+    for frame in frames:
+        chart.render_frame(frame)
+        app.display.update()
+        surfaces.append(app.screen.copy())
+    return surfaces
+
+
+def contact_sheet(
+    surfaces: list[pygame.surface.Surface],
+    captions: list[str],
+    font: pygame.font.Font,
+    columns: int = 0,
+    thumb_width: int = 480,
+    padding: int = 16,
+    bg_color: tuple[int, int, int] = (24, 24, 28),
+    text_color: tuple[int, int, int] = (255, 255, 255),
+) -> pygame.surface.Surface:
+    """Lay frames out in a grid of captioned thumbnails.
+
+    Args:
+        surfaces: Frames to lay out, in reading order
+        captions: Caption shown under each frame
+        font: Font for the captions
+        columns: Thumbnails per row (default: as square a grid as possible)
+        thumb_width: Width of each thumbnail; heights keep the aspect ratio
+        padding: Space around and between the thumbnails
+        bg_color: Background color of the sheet
+        text_color: Caption color
+
+    Returns:
+        The contact sheet surface
+    """
+    columns = columns or math.ceil(math.sqrt(len(surfaces)))
+    rows = math.ceil(len(surfaces) / columns)
+    width, height = surfaces[0].get_size()
+    thumb_size = (thumb_width, round(height * thumb_width / width))
+    cell_width = thumb_size[0] + padding
+    cell_height = thumb_size[1] + font.get_linesize() + padding
+
+    sheet = pygame.Surface(
+        (columns * cell_width + padding, rows * cell_height + padding)
+    )
+    sheet.fill(bg_color)
+    for idx, (surface, caption) in enumerate(zip(surfaces, captions)):
+        left = padding + (idx % columns) * cell_width
+        top = padding + (idx // columns) * cell_height
+        sheet.blit(pygame.transform.smoothscale(surface, thumb_size), (left, top))
+        text = font.render(caption, True, text_color)
+        sheet.blit(text, (left, top + thumb_size[1]))
+    return sheet
+
+
+def render_contact_sheet(
+    chart,
+    app: PgApp,
+    path: str,
+    every: int = 1,
+    columns: int = 0,
+    thumb_width: int = 480,
+) -> str:
+    """Render a chart's keyframes into a contact-sheet PNG.
+
+    Only the keyframes are drawn, so a sheet takes seconds where a full
+    render takes minutes.
+
+    Args:
+        chart: Graph or BarChartAnimation on a headless app
+        app: The chart's application
+        path: Output PNG file
+        every: Step between the columns shown for a BarChartAnimation
+        columns: Thumbnails per row (default: as square a grid as possible)
+        thumb_width: Width of each thumbnail
+
+    Returns:
+        The sheet's path
+    """
+    frames, captions = zip(*keyframes(chart, every))
+    surfaces = render_keyframes(chart, app, list(frames))
+    font = pygame.font.Font(chart.config.header_font, 24)
+    sheet = contact_sheet(surfaces, list(captions), font, columns, thumb_width)
+    pygame.image.save(sheet, path)
+    return path
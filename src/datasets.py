@@ -0,0 +1,189 @@
+import json
+import os
+import re
+from typing import Callable
+import numpy as np
+import pandas as pd
+
+# Bump when the cache layout changes so old caches are rebuilt
+CACHE_VERSION = 1
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "datasets")
+
+
+class Dataset:
+    """Normalised chart data: one row of values per entity, one column per timepoint."""
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        labels: list[str],
+        timepoint_labels: list[str],
+        attrs: dict = None,
+    ) -> None:
+        """Initialize a dataset.
+
+        Args:
+            values: Array of shape (entities, timepoints)
+            labels: Name of each entity
+            timepoint_labels: Name of each timepoint
+            attrs: Extra JSON-serialisable data the loader attached
+        """
+        self.values = values
+        self.labels = labels
+        self.timepoint_labels = timepoint_labels
+        self.attrs = attrs or {}
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Dataset":
+        """Build a dataset from a DataFrame with entities as rows."""
+        return cls(
+            df.to_numpy(dtype=np.float64),
+            [str(label) for label in df.index],
+            [str(label) for label in df.columns],
+            dict(df.attrs),
+        )
+
+    def to_frame(self) -> pd.DataFrame:
+        """Get the dataset as a DataFrame with entities as rows."""
+        df = pd.DataFrame(
+            self.values, index=self.labels, columns=self.timepoint_labels, copy=False
+        )
+        df.attrs.update(self.attrs)
+        return df
+
+
+class DatasetSource:
+    """A registered dataset: the files it is built from and how to build it."""
+
+    def __init__(
+        self,
+        name: str,
+        sources: Callable[[], list[str]],
+        build: Callable[[], pd.DataFrame],
+    ) -> None:
+        self.name = name
+        self.sources = sources
+        self.build = build
+
+    def fingerprint(self) -> list[dict]:
+        """Size and modification time of every source file.
+
+        Raises:
+            FileNotFoundError: If a source file is missing
+        """
+        fingerprint = []
+        for path in self.sources():
+            stat = os.stat(path)
+            fingerprint.append(
+                {
+                    "path": os.path.abspath(path),
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                }
+            )
+        return fingerprint
+
+
+REGISTRY: dict[str, DatasetSource] = {}
+
+
+def register_dataset(
+    name: str,
+    sources,
+    build: Callable[[], pd.DataFrame],
+) -> None:
+    """Register a dataset loader under a name.
+
+    Args:
+        name: Name to open the dataset by, e.g. "pypl/ODE/All"
+        sources: List of source file paths, or a function returning them
+        build: Function building the dataset as a DataFrame with entities as
+            rows and timepoints as columns; JSON-serialisable ``attrs`` are
+            kept
+    """
+    if not callable(sources):
+        paths = list(sources)
+        sources = lambda: paths
+    REGISTRY[name] = DatasetSource(name, sources, build)
+
+
+def dataset_names() -> list[str]:
+    """Get the names of all registered datasets."""
+    return sorted(REGISTRY)
+
+
+def _cache_path(cache_dir: str, name: str) -> str:
+    return os.path.join(cache_dir, re.sub(r"[^\w.-]+", "_", name))
+
+
+def _read_cache(directory: str, fingerprint: list[dict]):
+    try:
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            meta = json.load(f)
+        if meta["version"] != CACHE_VERSION or meta["sources"] != fingerprint:
+            return None
+        values = np.load(os.path.join(directory, "values.npy"), mmap_mode="r")
+    except (OSError, ValueError, KeyError):
+        return None
+    return Dataset(values, meta["labels"], meta["timepoint_labels"], meta["attrs"])
+
+
+def _write_cache(directory: str, dataset: Dataset, fingerprint: list[dict]) -> None:
+    os.makedirs(directory, exist_ok=True)
+    values_path = os.path.join(directory, "values.npy")
+    with open(f"{values_path}.tmp", "wb") as f:
+        np.save(f, np.ascontiguousarray(dataset.values, dtype=np.float64))
+    os.replace(f"{values_path}.tmp", values_path)
+
+    # The metadata is written last, so it only ever describes complete values
+    meta_path = os.path.join(directory, "meta.json")
+    with open(f"{meta_path}.tmp", "w") as f:
+        json.dump(
+            {
+                "version": CACHE_VERSION,
+                "sources": fingerprint,
+                "labels": dataset.labels,
+                "timepoint_labels": dataset.timepoint_labels,
+                "attrs": dataset.attrs,
+            },
+            f,
+        )
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+
+def open_dataset(name: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Dataset:
+    """Open a registered dataset, building it only if its sources changed.
+
+    The normalised values are cached as a memory-mapped ``.npy`` array and
+    the labels as JSON, keyed on the size and modification time of every
+    source file. Opening an unchanged dataset reads no source files.
+
+    Args:
+        name: Registered dataset name
+        cache_dir: Directory for the cached datasets ("" disables the cache)
+
+    Returns:
+        The dataset
+
+    Raises:
+        KeyError: If no dataset is registered under the name
+    """
+    if name not in REGISTRY:
+        raise KeyError(f"Unknown dataset {name!r}, expected one of {dataset_names()}")
+    source = REGISTRY[name]
+    fingerprint = source.fingerprint()
+
+    directory = _cache_path(cache_dir, name) if cache_dir else ""
+    if directory:
+        dataset = _read_cache(directory, fingerprint)
+        if dataset is not None:
+            return dataset
+
+    dataset = Dataset.from_frame(source.build())
+    if directory:
+        try:
+            _write_cache(directory, dataset, fingerprint)
+        except OSError as e:
+            print(f"Could not cache dataset {name}: {e}")
+    return dataset
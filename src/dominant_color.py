@@ -0,0 +1,93 @@
+import json
+import os
+from typing import Optional
+import numpy as np
+
+# Bump when the extraction changes so stale cached colours are ignored
+ALGORITHM_VERSION = 1
+
+
+def dominant_color(pixels: np.ndarray) -> Optional[tuple[int, int, int]]:
+    """Pick the most frequent vibrant colour from an array of pixels.
+
+    Pixels are quantised to steps of 32, background-like colours (near
+    white, near black and grays) are dropped, and the colour with the best
+    count × vibrancy score wins. Ties go to the colour seen first.
+
+    Args:
+        pixels: Array of shape (..., 3) with RGB values
+
+    Returns:
+        RGB tuple clamped to 0-255, or None if every pixel is background
+    """
+    quantised = (np.round(pixels.reshape(-1, 3) / 32) * 32).astype(np.int64)
+    r, g, b = quantised[:, 0], quantised[:, 1], quantised[:, 2]
+
+    light = (r > 240) & (g > 240) & (b > 240)
+    dark = (r < 15) & (g < 15) & (b < 15)
+    avg = (r + g + b) / 3
+    gray = (np.abs(r - avg) < 10) & (np.abs(g - avg) < 10) & (np.abs(b - avg) < 10)
+    colors = quantised[~(light | dark | gray)]
+    if not len(colors):
+        return None
+
+    # Unique colours ordered by first appearance, with their counts
+    keys = (colors[:, 0] << 20) | (colors[:, 1] << 10) | colors[:, 2]
+    unique, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(first)
+    unique, counts = unique[order], counts[order]
+    r, g, b = unique >> 20, (unique >> 10) & 0x3FF, unique & 0x3FF
+
+    max_val = np.maximum(np.maximum(r, g), b)
+    min_val = np.minimum(np.minimum(r, g), b)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        saturation = np.where(max_val == 0, 0, (max_val - min_val) / max_val)
+    intensity = (r + g + b) / 3 / 255
+    scores = saturation * (1 - np.abs(intensity - 0.5))
+
+    best = int(np.argmax(counts * scores))
+    return tuple(int(max(0, min(255, channel[best]))) for channel in (r, g, b))
+
+
+class DominantColorCache:
+    """On-disk cache of dominant colours keyed by image content hash."""
+
+    def __init__(self, path: str) -> None:
+        """Load the cache file if it exists.
+
+        Args:
+            path: JSON file holding the cached colours
+        """
+        self.path = path
+        self.colors: dict[str, Optional[list[int]]] = {}
+        self.dirty = False
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == ALGORITHM_VERSION:
+                self.colors = data["colors"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.colors
+
+    def get(self, key: str) -> Optional[tuple[int, int, int]]:
+        """Get a cached RGB colour, None meaning the image had no dominant colour."""
+        color = self.colors[key]
+        return tuple(color) if color is not None else None
+
+    def set(self, key: str, color: Optional[tuple[int, int, int]]) -> None:
+        self.colors[key] = list(color) if color is not None else None
+        self.dirty = True
+
+    def save(self) -> None:
+        """Write the cache atomically if anything changed."""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"version": ALGORITHM_VERSION, "colors": self.colors}, f)
+        os.replace(temp_path, self.path)
+        self.dirty = False
@@ -1,10 +1,24 @@
 from .color import Color
+import hashlib
+import io
 import math
+import os
+import numpy as np
 from .super_rect import SuperRect
 import pygame
 import time
-from typing import Iterator, Tuple
+from typing import Iterator, Optional, Tuple
 from .pg_app import PgApp
+from .label_cache import LabelCache
+from .dominant_color import DominantColorCache, dominant_color
+from .image_cache import ImageCache, content_key
+
+# Bump when rendering changes, so a resumed recording never joins frames
+# drawn by two versions
+RENDER_VERSION = 1
+
+# Config fields that don't change what a chart draws
+UNRENDERED_FIELDS = ("record_path", "cache_dir", "profile_path", "profile_allocations")
 
 
 class GraphConfig:
@@ -33,6 +47,10 @@ class GraphConfig:
         record_path: str = "",
         wait_time_after_completion: int = 3,
         image_paths: list[str] = None,
+        cache_dir: str = ".cache",
+        image_size: tuple[int, int] = None,
+        profile_path: str = "",
+        profile_allocations: bool = False,
     ) -> None:
         """Initialize graph configuration.
 
@@ -58,6 +76,14 @@ class GraphConfig:
             record_path: Path to save the recording
             wait_time_after_completion: Time to wait after completion before saving the recording
             image_paths: List of image paths
+            cache_dir: Directory for data derived from images, such as their
+                dominant colors ("" disables the cache)
+            image_size: Tuple of (width, height) box images are scaled down to
+                fit, or None to show them at their native size
+            profile_path: Path to save a Chrome trace of the time spent in
+                each phase of every frame; a per-phase report is printed too
+                ("" disables profiling)
+            profile_allocations: Also record the bytes each phase allocates
         """
         self.header_font = header_font
         self.header_font_size = header_font_size
@@ -83,6 +109,32 @@ class GraphConfig:
         self.record_path = record_path
         self.wait_time_after_completion = wait_time_after_completion
         self.image_paths = image_paths or []
+        self.cache_dir = cache_dir
+        self.image_size = image_size
+        self.profile_path = profile_path
+        self.profile_allocations = profile_allocations
+
+
+def chart_fingerprint(config: GraphConfig, frames: int, *data) -> str:
+    """Hash everything a chart's frames are drawn from.
+
+    Args:
+        config: Chart configuration
+        frames: Number of frames a run renders
+        data: The chart's data and anything else it draws from, as bytes or
+            values with a stable repr
+
+    Returns:
+        Hex digest; charts with the same fingerprint draw the same frames
+    """
+    digest = hashlib.sha256(f"{RENDER_VERSION}:{frames}".encode())
+    for name, value in sorted(vars(config).items()):
+        if name not in UNRENDERED_FIELDS:
+            digest.update(f"{name}={value!r};".encode())
+    for part in data:
+        digest.update(b"|")
+        digest.update(part if isinstance(part, bytes) else repr(part).encode())
+    return digest.hexdigest()
 
 
 class GraphHeader:
@@ -168,6 +220,7 @@ class TextRenderer:
         """
         self.font = pygame.font.Font(config.header_font, config.small_text_size)
         self.renders = []
+        self.label_caches: dict[tuple, LabelCache] = {}
 
         for bar in bars:
             render = self.font.render(bar.title, True, config.header_bg_color.rgb())
@@ -176,6 +229,13 @@ class TextRenderer:
             render_rect.right = bar.x - config.text_bar_distance
             self.renders.append((render, render_rect))
 
+    def label_cache(self, color: Color) -> LabelCache:
+        """Get the label cache for value labels in the given colour."""
+        key = color.rgb()
+        if key not in self.label_caches:
+            self.label_caches[key] = LabelCache(self.font, key)
+        return self.label_caches[key]
+
     def create_continuous_renders(
         self,
         bars: list[SuperRect],
@@ -196,20 +256,239 @@ class TextRenderer:
         Yields:
             Tuple of (text surface, position rect, visibility flag)
         """
+        labels = self.label_cache(color)
         for bar in bars:
             value = str(
                 int(bar.width // width_multiplier)
                 if bar.width < bar.target
                 else int(bar.target // width_multiplier)
             )
-            value = f"{value_prepost[0]}{value}{value_prepost[1]}"
-            render = self.font.render(value, True, color.rgb())
+            render = labels.label(value, value_prepost)
             render_rect = render.get_rect()
             render_rect.right = bar.right - gap_from_right
             render_rect.centery = bar.centery
             yield render, render_rect, bar.width > gap_from_right + render_rect.width
 
 
+class GrowthSchedule:
+    """Per-bar start times and growth rates for one animation type.
+
+    Every bar grows linearly from its start time, so a bar's width at any
+    time is a closed-form expression and a whole frame is evaluated as a
+    handful of array operations. Sequential flat animations start each bar
+    once the bars before it could have finished, via prefix sums of their
+    growth times.
+    """
+
+    TYPES = (
+        "simultaneous",
+        "top_down",
+        "bottom_up",
+        "simultaneous_flat",
+        "top_down_flat",
+        "bottom_up_flat",
+    )
+
+    def __init__(self, targets: np.ndarray, animation_type: str, speed: float) -> None:
+        """Precompute start times and rates.
+
+        Args:
+            targets: Target width of each bar
+            animation_type: One of the Graph animation types
+            speed: Seconds per bar, or value per second for "_flat" types
+        """
+        self.targets = targets
+        self.speed = speed
+        self.flat = animation_type.endswith("_flat")
+        self.direction = animation_type.removesuffix("_flat")
+        count = len(targets)
+
+        # Order in which the bars grow
+        if self.direction == "bottom_up":
+            self.sequence = np.arange(count)[::-1]
+        else:
+            self.sequence = np.arange(count)
+        position = np.empty(count)
+        position[self.sequence] = np.arange(count)
+
+        if self.flat:
+            self.rates = np.full(count, speed * 100.0)
+            if self.direction == "simultaneous":
+                self.starts = np.zeros(count)
+            else:
+                durations = targets[self.sequence] / speed
+                previous = np.concatenate(([0.0], np.cumsum(durations)[:-1]))
+                self.starts = np.empty(count)
+                self.starts[self.sequence] = previous / 100
+        else:
+            self.increments = targets / (speed * 100)
+            self.rates = self.increments * 100
+            if self.direction == "simultaneous":
+                self.starts = np.zeros(count)
+            else:
+                self.starts = position * speed
+
+        # Only sequential flat animations wait for the previous bar to finish
+        self.gated = self.flat and self.direction != "simultaneous"
+        self.completions: dict[int, np.ndarray] = {}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.end_times = np.where(
+                targets > 0, self.starts + targets / self.rates, 0.0
+            )
+
+    def widths_at(self, time_elapsed, bars=slice(None)) -> np.ndarray:
+        """Width each bar's growth formula gives at a time.
+
+        Args:
+            time_elapsed: Animation time, scalar or one per selected bar
+            bars: Index or mask selecting the bars (default: all)
+
+        Returns:
+            Rounded widths of the selected bars
+        """
+        deltat = time_elapsed - self.starts[bars]
+        if self.flat:
+            return np.round(deltat * self.speed * 100)
+        return np.round(deltat * self.increments[bars] * 100)
+
+    def update(self, widths: np.ndarray, time_elapsed: float) -> np.ndarray:
+        """Grow every incomplete bar to its width at the given time.
+
+        Args:
+            widths: Current bar widths
+            time_elapsed: Animation time
+
+        Returns:
+            New bar widths
+        """
+        grown = self.widths_at(time_elapsed)
+        if not self.gated:
+            return np.where(widths < self.targets, grown, widths)
+
+        # A bar may only grow once the bar before it in the sequence has
+        # reached its target, including bars that reach it this very frame.
+        current = widths[self.sequence]
+        targets = self.targets[self.sequence]
+        grown = grown[self.sequence]
+        complete = current >= targets
+        reaches = grown >= targets
+        # The gate at a bar is open if, walking back through the sequence,
+        # a complete bar is found before a bar that stays incomplete.
+        events = complete | ~reaches
+        last_event = np.maximum.accumulate(np.where(events, np.arange(len(events)), -1))
+        previous_event = np.concatenate(([-1], last_event[:-1]))
+        gate = (previous_event == -1) | complete[np.maximum(previous_event, 0)]
+        current = np.where(gate & ~complete, grown, current)
+
+        result = np.empty_like(widths)
+        result[self.sequence] = current
+        return result
+
+    def animating(self, widths: np.ndarray) -> np.ndarray:
+        """Flag the bars that are currently growing.
+
+        Args:
+            widths: Current bar widths
+
+        Returns:
+            Boolean array, True for bars that are animating
+        """
+        complete = widths >= self.targets
+        if self.direction == "simultaneous":
+            return ~complete
+        # All bars before this one in the sequence are complete
+        ordered = complete[self.sequence]
+        before = np.concatenate(([True], np.logical_and.accumulate(ordered)[:-1]))
+        result = np.empty_like(complete)
+        result[self.sequence] = before & ~ordered
+        return result
+
+    def reach_frames(self, fps: int) -> np.ndarray:
+        """First frame at which each bar's growth formula reaches its target.
+
+        Args:
+            fps: Frames per second of the animation clock
+
+        Returns:
+            Frame index per bar, -1 for bars with nothing to grow
+        """
+        result = np.full(len(self.targets), -1, dtype=np.int64)
+        pending = self.targets > 0
+        if not pending.any():
+            return result
+        targets = self.targets[pending]
+        starts = self.starts[pending]
+        rates = self.rates[pending]
+        # Start just before the exact crossing and step forward to the
+        # first frame whose rounded width reaches the target.
+        frames = np.maximum(np.floor((starts + (targets - 1) / rates) * fps) - 1, 0)
+        while True:
+            times = frames / fps
+            reached = self.widths_at(times, pending) >= targets
+            if reached.all():
+                result[pending] = frames
+                return result
+            frames = np.where(reached, frames, frames + 1)
+
+    def completion_frames(self, fps: int) -> np.ndarray:
+        """Frame at which each bar reaches its target during a run.
+
+        Gated bars can't complete before the bar ahead of them in the
+        sequence does.
+
+        Args:
+            fps: Frames per second of the animation clock
+
+        Returns:
+            Frame index per bar, -1 for bars with nothing to grow
+        """
+        if fps not in self.completions:
+            completion = self.reach_frames(fps)
+            if self.gated:
+                previous = -1
+                for idx in self.sequence.tolist():
+                    if completion[idx] >= 0:
+                        completion[idx] = max(completion[idx], previous)
+                    previous = completion[idx]
+            self.completions[fps] = completion
+        return self.completions[fps]
+
+    def completion_frame(self, fps: int) -> int:
+        """Index of the first frame at which every bar has reached its target.
+
+        Args:
+            fps: Frames per second of the animation clock
+
+        Returns:
+            Frame index
+        """
+        return int(max(self.completion_frames(fps).max(initial=0), 0))
+
+    def widths_at_frame(self, frame: int, fps: int, initial: np.ndarray) -> np.ndarray:
+        """Bar widths after a run has rendered a frame, without replaying it.
+
+        A bar follows its growth formula until the frame it completes at and
+        keeps that width afterwards; gated bars keep their initial width
+        until the bar ahead of them completes.
+
+        Args:
+            frame: Frame index
+            fps: Frames per second of the animation clock
+            initial: Bar widths before the first frame
+
+        Returns:
+            Bar widths, identical to those of a sequential run
+        """
+        completion = self.completion_frames(fps)
+        widths = self.widths_at(np.minimum(frame, completion) / fps)
+        waiting = completion < 0
+        if self.gated:
+            gates = np.full(len(completion), -1, dtype=np.int64)
+            gates[self.sequence[1:]] = completion[self.sequence[:-1]]
+            waiting |= frame < gates
+        return np.where(waiting, initial, widths)
+
+
 class Graph:
     """Handles the creation and animation of a bar graph visualization."""
 
@@ -241,119 +520,118 @@ class Graph:
         self.is_complete = False
         self.completion_time = None
 
+        # Bar widths and growth schedules as arrays, synced to the bars
+        self.widths = np.array([bar.width for bar in self.bars], dtype=float)
+        self.initial_widths = self.widths.copy()
+        # State of the frame on screen, to skip redrawing identical frames
+        self.drawn_state = None
+        self.targets = np.array([bar.target for bar in self.bars], dtype=float)
+        self.animating = np.zeros(len(self.bars), dtype=bool)
+        self.schedules: dict[tuple[str, float], GrowthSchedule] = {}
+        self.schedule = self._schedule(config.animation_type, config.animation_speed)
+        self.duration = float(self.schedule.end_times.max(initial=0.0))
+
         # Initialize images and their colors
         self.images = [None] * len(data)
+        # Content hash per image index, None if it couldn't be read
+        self.image_keys = [None] * len(data)
+        # Dominant color per image index, None if it has no usable color
+        self.image_colors: dict[int, Optional[tuple[int, int, int]]] = {}
         if config.image_paths:
             self._load_images(config.image_paths)
             self._update_bar_colors()
 
     def _load_images(self, image_paths: list[str]) -> None:
-        """Load images from provided paths.
+        """Load images from provided paths, with their dominant colors.
+
+        Each file is read once and its content hash identifies it in the
+        on-disk caches. It is decoded at most once: only when the image
+        cache has no thumbnail for it or the color cache no color, and the
+        color is then extracted from the same decoded original.
 
         Args:
             image_paths: List of paths to images
         """
+        image_cache = ImageCache(self.config.cache_dir, self.config.image_size)
+        color_cache = None
+        if self.config.cache_dir:
+            color_cache = DominantColorCache(
+                os.path.join(self.config.cache_dir, "dominant_colors.json")
+            )
+
         for idx, img_path in enumerate(image_paths):
             if idx >= len(self.images):
                 break
             try:
-                image = pygame.image.load(img_path)
-                self.images[idx] = image
-            except pygame.error:
+                with open(img_path, "rb") as f:
+                    content = f.read()
+                key = self.image_keys[idx] = content_key(content)
+                original = None
+                if color_cache is None or key not in color_cache:
+                    original = pygame.image.load(io.BytesIO(content), img_path)
+                self.images[idx], _ = image_cache.load(content, img_path, key, original)
+            except (pygame.error, OSError):
                 print(f"Could not load image: {img_path}")
                 self.images[idx] = None
+                continue
 
-    def _get_dominant_color(self, surface: pygame.Surface) -> Color:
-        """Extract the dominant color from a pygame surface quickly.
+            if original is None:
+                self.image_colors[idx] = color_cache.get(key)
+                continue
+            try:
+                # Analyze the original, not the resized thumbnail
+                rgb = self._dominant_rgb(original)
+            except Exception as e:
+                print(f"Error extracting color for image {idx}: {e}")
+                # Keep original color if extraction fails
+                continue
+            self.image_colors[idx] = rgb
+            if color_cache is not None:
+                color_cache.set(key, rgb)
+
+        if color_cache is not None:
+            try:
+                color_cache.save()
+            except OSError as e:
+                print(f"Could not save color cache: {e}")
+
+    def _dominant_rgb(self, surface: pygame.Surface) -> Optional[tuple[int, int, int]]:
+        """Extract the dominant RGB color from a pygame surface.
 
         Args:
             surface: Pygame surface to analyze
 
         Returns:
-            Color: Most dominant color found in the image
+            RGB tuple, or None if the image has no usable color
         """
         # Scale down image for faster processing
-        SCALE_SIZE = (32, 32)
-        small_surface = pygame.transform.scale(surface, SCALE_SIZE)
+        small_surface = pygame.transform.scale(surface, (32, 32))
 
-        # Convert surface to pixel array
         try:
             pixels = pygame.surfarray.pixels3d(small_surface)
         except:
-            return self.config.colors[0]
-
-        # Reshape to 2D array of pixels
-        pixels_2d = pixels.reshape(-1, 3)
-
-        # Dictionary to store color frequencies and their vibrancy scores
-        color_scores = {}
-
-        def is_background(r, g, b):
-            # Skip very light colors
-            if r > 240 and g > 240 and b > 240:
-                return True
-            # Skip very dark colors
-            if r < 15 and g < 15 and b < 15:
-                return True
-            # Skip grays
-            avg = (r + g + b) / 3
-            if abs(r - avg) < 10 and abs(g - avg) < 10 and abs(b - avg) < 10:
-                return True
-            return False
-
-        def get_color_score(r, g, b):
-            # Calculate saturation
-            max_val = max(r, g, b)
-            min_val = min(r, g, b)
-            saturation = 0 if max_val == 0 else (max_val - min_val) / max_val
-
-            # Calculate intensity
-            intensity = (r + g + b) / 3 / 255
-
-            # Prefer colors with high saturation and medium intensity
-            return saturation * (1 - abs(intensity - 0.5))
-
-        # Count colors and calculate their scores
-        for pixel in pixels_2d:
-            r = round(pixel[0] / 32) * 32
-            g = round(pixel[1] / 32) * 32
-            b = round(pixel[2] / 32) * 32
-
-            if not is_background(r, g, b):
-                color_key = (r, g, b)
-                if color_key not in color_scores:
-                    color_scores[color_key] = {
-                        "count": 0,
-                        "score": get_color_score(r, g, b),
-                    }
-                color_scores[color_key]["count"] += 1
+            return None
+        return dominant_color(pixels)
 
-        if not color_scores:
-            return self.config.colors[0]
-
-        # Find color with best combination of frequency and vibrancy
-        best_color = max(
-            color_scores.items(), key=lambda x: x[1]["count"] * x[1]["score"]
-        )[0]
+    def _get_dominant_color(self, surface: pygame.Surface) -> Color:
+        """Extract the dominant color from a pygame surface quickly.
 
-        # Ensure RGB values are in valid range and properly formatted
-        r = max(0, min(255, best_color[0]))
-        g = max(0, min(255, best_color[1]))
-        b = max(0, min(255, best_color[2]))
+        Args:
+            surface: Pygame surface to analyze
 
-        return Color(f"#{r:02x}{g:02x}{b:02x}")
+        Returns:
+            Color: Most dominant color found in the image
+        """
+        rgb = self._dominant_rgb(surface)
+        return Color(rgb) if rgb is not None else self.config.colors[0]
 
     def _update_bar_colors(self) -> None:
         """Update bar colors based on dominant colors from corresponding images."""
-        for idx, (image, bar) in enumerate(zip(self.images, self.bars)):
-            if image is not None:
-                try:
-                    dominant_color = self._get_dominant_color(image)
-                    bar.color = dominant_color
-                except Exception as e:
-                    print(f"Error extracting color for image {idx}: {e}")
-                    # Keep original color if extraction fails
-                    continue
+        for idx, rgb in self.image_colors.items():
+            if idx < len(self.bars):
+                self.bars[idx].color = (
+                    Color(rgb) if rgb is not None else self.config.colors[0]
+                )
 
     def _is_bar_animating(self, bar_index: int) -> bool:
         """Check if a specific bar is currently animating.
@@ -364,36 +642,18 @@ class Graph:
         Returns:
             bool: True if the bar is currently animating
         """
-        if self.config.animation_type in ["simultaneous", "simultaneous_flat"]:
-            return self.bars[bar_index].width < self.bars[bar_index].target
-        elif self.config.animation_type in ["top_down", "top_down_flat"]:
-            # For top-down, check if all previous bars are complete and current bar isn't
-            return (
-                all(bar.width >= bar.target for bar in self.bars[:bar_index])
-                and self.bars[bar_index].width < self.bars[bar_index].target
-            )
-        elif self.config.animation_type in ["bottom_up", "bottom_up_flat"]:
-            # For bottom-up, check if all subsequent bars are complete and current bar isn't
-            return (
-                all(bar.width >= bar.target for bar in self.bars[bar_index + 1 :])
-                and self.bars[bar_index].width < self.bars[bar_index].target
-            )
-        return False
+        return bool(self.animating[bar_index])
 
     def _render_current_image(self) -> None:
         """Render the image for the currently animating bar at bottom right."""
-        for idx, bar in enumerate(self.bars):
-            if (
-                self._is_bar_animating(idx)
-                and idx < len(self.images)
-                and self.images[idx]
-            ):
+        for idx in np.flatnonzero(self.animating).tolist():
+            if idx < len(self.images) and self.images[idx]:
                 image = self.images[idx]
                 image_rect = image.get_rect()
                 # Position image at bottom right
                 image_rect.right = self.pgapp.width - 50
                 image_rect.bottom = self.pgapp.height - 50
-                self.pgapp.screen.blit(image, image_rect)
+                self.pgapp.display.blit(image, image_rect)
                 # Only show one image at a time
                 break
 
@@ -403,22 +663,40 @@ class Graph:
         Returns:
             bool: True if all bars are complete, False otherwise
         """
-        self.is_complete = all(bar.width >= bar.target for bar in self.bars)
-        if self.is_complete and not self.completion_time:
-            self.completion_time = time.time()
+        self.is_complete = bool((self.widths >= self.targets).all())
+        if self.is_complete and self.completion_time is None:
+            self.completion_time = self.pgapp.time_elapsed
         return self.is_complete
 
+    def _schedule(self, animation_type: str, speed: float) -> GrowthSchedule:
+        """Get the growth schedule for an animation type, building it once."""
+        key = (animation_type, speed)
+        if key not in self.schedules:
+            self.schedules[key] = GrowthSchedule(self.targets, animation_type, speed)
+        return self.schedules[key]
+
+    def _grow(self, animation_type: str, speed: float) -> None:
+        """Advance the bar widths to the current time and sync the bars.
+
+        Args:
+            animation_type: One of the animation types
+            speed: Seconds per bar, or value per second for "_flat" types
+        """
+        schedule = self._schedule(animation_type, speed)
+        widths = schedule.update(self.widths, self.pgapp.time_elapsed)
+        for idx in np.flatnonzero(widths != self.widths).tolist():
+            self.bars[idx].width = int(widths[idx])
+        self.widths = widths
+        if self.config.animation_type in GrowthSchedule.TYPES:
+            self.animating = self.schedule.animating(widths)
+
     def simultaneous_grow(self, time_each: float) -> None:
         """Grow all bars simultaneously.
 
         Args:
             time_each: Time in seconds for full growth
         """
-        for item in self.bars:
-            if item.width < item.target:
-                item.width = self._increment_rect(
-                    item.target, self.pgapp.time_elapsed, time_each
-                )
+        self._grow("simultaneous", time_each)
 
     def simultaneous_grow_flat(self, speed_multiplier: float) -> None:
         """Grow all bars simultaneously with flat animation speed.
@@ -426,11 +704,7 @@ class Graph:
         Args:
             speed_multiplier: Speed multiplier for flat animation
         """
-        for item in self.bars:
-            if item.width < item.target:
-                item.width = self._increment_rect_flat(
-                    item.target, self.pgapp.time_elapsed, speed_multiplier
-                )
+        self._grow("simultaneous_flat", speed_multiplier)
 
     def top_down_grow(self, time_each: float) -> None:
         """Grow bars sequentially from top to bottom.
@@ -438,11 +712,7 @@ class Graph:
         Args:
             time_each: Time in seconds for each bar's growth
         """
-        for idx, item in enumerate(self.bars):
-            if item.width < item.target:
-                item.width = self._increment_rect(
-                    item.target, self.pgapp.time_elapsed - idx * time_each, time_each
-                )
+        self._grow("top_down", time_each)
 
     def top_down_grow_flat(self, speed_multiplier: float) -> None:
         """Grow bars sequentially from top to bottom with flat animation speed.
@@ -450,18 +720,7 @@ class Graph:
         Args:
             speed_multiplier: Speed multiplier for flat animation
         """
-        for idx, item in enumerate(self.bars):
-            if idx > 0 and self.bars[idx - 1].width < self.bars[idx - 1].target:
-                continue
-            if item.width < item.target:
-                previous_time = (
-                    sum(bar.target / speed_multiplier for bar in self.bars[:idx]) / 100
-                )
-                item.width = self._increment_rect_flat(
-                    item.target,
-                    self.pgapp.time_elapsed - previous_time,
-                    speed_multiplier,
-                )
+        self._grow("top_down_flat", speed_multiplier)
 
     def bottom_up_grow(self, time_each: float) -> None:
         """Grow bars sequentially from bottom to top.
@@ -469,11 +728,7 @@ class Graph:
         Args:
             time_each: Time in seconds for each bar's growth
         """
-        for idx, item in enumerate(self.bars[::-1]):
-            if item.width < item.target:
-                item.width = self._increment_rect(
-                    item.target, self.pgapp.time_elapsed - idx * time_each, time_each
-                )
+        self._grow("bottom_up", time_each)
 
     def bottom_up_grow_flat(self, speed_multiplier: float) -> None:
         """Grow bars sequentially from bottom to top with flat animation speed.
@@ -481,22 +736,32 @@ class Graph:
         Args:
             speed_multiplier: Speed multiplier for flat animation
         """
-        for idx, item in enumerate(self.bars[::-1]):
-            if (
-                idx > 0
-                and self.bars[::-1][idx - 1].width < self.bars[::-1][idx - 1].target
-            ):
-                continue
-            if item.width < item.target:
-                previous_time = (
-                    sum(bar.target / speed_multiplier for bar in self.bars[::-1][:idx])
-                    / 100
-                )
-                item.width = self._increment_rect_flat(
-                    item.target,
-                    self.pgapp.time_elapsed - previous_time,
-                    speed_multiplier,
-                )
+        self._grow("bottom_up_flat", speed_multiplier)
+
+    def fingerprint(self) -> str:
+        """Identify what the chart draws, so only its own recording resumes."""
+        return chart_fingerprint(
+            self.config,
+            self.frame_count(),
+            self.data,
+            self.header.rect.size,
+            self.image_keys,
+        )
+
+    def frame_count(self) -> int:
+        """Number of frames a run renders, including the completion hold.
+
+        Returns:
+            Frame count, known before rendering
+        """
+        fps = self.config.fps
+        completed = self.schedule.completion_frame(fps)
+        # Completion is checked after the clock advances past a frame
+        completion_time = (completed + 1) / fps
+        frames = completed + 1
+        while frames / fps - completion_time <= self.config.wait_time_after_completion:
+            frames += 1
+        return frames
 
     def create_continuous_renders(
         self, gap_from_right: int, color: Color
@@ -518,35 +783,6 @@ class Graph:
             self.config.value_prepost,
         )
 
-    @staticmethod
-    def _increment_rect(target: float, deltat: float, time_each: float) -> int:
-        """Calculate incremental width for smooth bar growth.
-
-        Args:
-            target: Target width for bar
-            deltat: Time elapsed since start
-            time_each: Total time for growth
-
-        Returns:
-            New width value for bar
-        """
-        increment_per_ms = target / (time_each * 100)
-        return round(deltat * increment_per_ms * 100)
-
-    @staticmethod
-    def _increment_rect_flat(target: float, deltat: float, value: float) -> int:
-        """Calculate incremental width for flat animation speed.
-
-        Args:
-            target: Target width for bar
-            deltat: Time elapsed since start
-            value: Value per second for flat animation
-
-        Returns:
-            New width value for bar
-        """
-        return round(deltat * value * 100)
-
     @staticmethod
     def roundup(x: float) -> int:
         """Round up to nearest hundred.
@@ -559,8 +795,8 @@ class Graph:
         """
         return int(math.ceil(x / 100.0)) * 100
 
-    def run(self) -> None:
-        """Run the graph animation loop."""
+    def animate(self) -> None:
+        """Grow the bars using the configured animation type."""
         animation_methods = {
             "simultaneous": self.simultaneous_grow,
             "top_down": self.top_down_grow,
@@ -569,20 +805,65 @@ class Graph:
             "top_down_flat": self.top_down_grow_flat,
             "bottom_up_flat": self.bottom_up_grow_flat,
         }
+        animation_methods[self.config.animation_type](self.config.animation_speed)
 
-        if self.config.record_path:
-            self.pgapp.recorder.start_rec(self.config.fps)
+    def seek(self, frame: int) -> None:
+        """Move the bars and the app's clock straight to a frame.
 
-        while self.pgapp.running:
-            self.pgapp.t0 = time.time()
-            for event in pygame.event.get():
-                self.pgapp.kill_switch(event)
+        The state matches a run that has drawn every earlier frame, so the
+        next render_frame() draws exactly the frame a run would, without
+        replaying the frames before it.
 
-            # Draw frame
-            self.pgapp.screen.fill(self.config.bg_color.rgb())
-            animation_methods[self.config.animation_type](self.config.animation_speed)
+        Args:
+            frame: Frame index
+        """
+        fps = self.config.fps
+        self.pgapp.frame_index = frame
+        self.pgapp.time_elapsed = frame / fps
+        self.pgapp.display.invalidate()
+        self.drawn_state = None
+
+        widths = self.initial_widths
+        if frame > 0:
+            widths = self.schedule.widths_at_frame(frame - 1, fps, widths)
+        for bar, width in zip(self.bars, widths.tolist()):
+            bar.width = int(width)
+        self.widths = widths
+        self.animating = self.schedule.animating(widths)
+
+        # Completion is checked after the clock advances past a frame
+        completed = self.schedule.completion_frame(fps)
+        self.is_complete = completed < frame
+        self.completion_time = (completed + 1) / fps if completed < frame else None
+
+    def render_frame(self, frame: Optional[int] = None) -> bool:
+        """Advance the bars to the app's current time and draw the frame.
+
+        Args:
+            frame: Frame index to seek to first, for random access
 
-            # Draw main graph elements
+        Returns:
+            False if the bars didn't change since the last drawn frame, which
+            is then still on screen and isn't drawn again
+        """
+        if frame is not None:
+            self.seek(frame)
+        profiler = self.pgapp.profiler
+        with profiler.phase("animate"):
+            self.animate()
+
+        # Bar widths and the image shown are all a frame depends on
+        state = (self.widths, self.animating)
+        if self.drawn_state is not None and all(
+            np.array_equal(new, old) for new, old in zip(state, self.drawn_state)
+        ):
+            return False
+        self.drawn_state = state
+
+        self.pgapp.screen.fill(self.config.bg_color.rgb())
+
+        # Draw main graph elements
+        with profiler.phase("draw_bars"):
             self.pgapp.draw_data_rects(
                 self.bars,
                 self.header,
@@ -590,31 +871,68 @@ class Graph:
                 self.header.text_render,
                 self.header.text_rect,
             )
+        with profiler.phase("bar_labels"):
             self.pgapp.draw_rect_text(
                 self.store_rect_render, [bar.width > 0 for bar in self.bars]
             )
+        with profiler.phase("value_labels"):
             renders = self.create_continuous_renders(
                 self.config.value_gap, self.config.bg_color
             )
             self.pgapp.draw_continuous_numbers(renders)
 
-            # Render the current image if any
-            if self.images:
+        # Render the current image if any
+        if self.images:
+            with profiler.phase("image"):
                 self._render_current_image()
+        return True
 
-            # Update display
-            self.pgapp.update_display()
-            self.pgapp.fpsClock.tick(self.config.fps)
-            self.pgapp.time_elapsed += time.time() - self.pgapp.t0
-
-            if self.check_completion():
-                if (
-                    self.completion_time
-                    and time.time() - self.completion_time
-                    > self.config.wait_time_after_completion
-                ):
+    def is_finished(self) -> bool:
+        """Check if the completion hold has elapsed.
+
+        Returns:
+            bool: True once all bars are complete and the hold is over
+        """
+        return (
+            self.check_completion()
+            and self.pgapp.time_elapsed - self.completion_time
+            > self.config.wait_time_after_completion
+        )
+
+    def run(self) -> None:
+        """Run the graph animation loop."""
+        if self.config.record_path:
+            recorded = self.pgapp.start_recording(
+                self.config.record_path, self.config.fps, self.fingerprint()
+            )
+            # Continue an interrupted segmented recording after its last frame
+            if recorded and recorded >= self.frame_count():
+                self.pgapp.finish_recording()
+                return
+            if recorded:
+                self.seek(recorded)
+        if self.config.profile_path:
+            self.pgapp.start_profiling(self.config.profile_allocations)
+
+        while self.pgapp.running:
+            with self.pgapp.profiler.frame():
+                self.pgapp.t0 = time.time()
+                with self.pgapp.profiler.phase("events"):
+                    for event in pygame.event.get():
+                        self.pgapp.kill_switch(event)
+
+                # Identical frames are held instead of drawn and captured again
+                if self.render_frame():
+                    self.pgapp.update_display()
+                else:
+                    self.pgapp.hold_display()
+                self.pgapp.advance_clock(self.config.fps)
+
+                if self.is_finished():
                     if self.config.record_path:
-                        self.pgapp.recorder.stop_rec().save_recording(
-                            self.config.record_path
-                        )
+                        with self.pgapp.profiler.phase("finish_recording"):
+                            self.pgapp.finish_recording()
                     self.pgapp.running = False
+
+        if self.config.profile_path:
+            self.pgapp.finish_profiling(self.config.profile_path)
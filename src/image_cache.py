@@ -0,0 +1,135 @@
+import hashlib
+import io
+import os
+from typing import Optional
+import numpy as np
+import pygame
+
+# Bump when the preparation changes so stale cached pixels are ignored
+PIPELINE_VERSION = 1
+
+
+def fit_size(size: tuple[int, int], box: Optional[tuple[int, int]]) -> tuple[int, int]:
+    """Scale a size down to fit inside a box, keeping its aspect ratio.
+
+    Args:
+        size: Tuple of (width, height) of the image
+        box: Tuple of (width, height) to fit inside, or None for no limit
+
+    Returns:
+        Tuple of (width, height); images are never scaled up
+    """
+    width, height = size
+    if box is None or (width <= box[0] and height <= box[1]):
+        return size
+    scale = min(box[0] / width, box[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def content_key(content: bytes) -> str:
+    """Get the cache key of an image file's contents."""
+    return hashlib.sha256(content).hexdigest()
+
+
+class ImageCache:
+    """Loads images once into display-ready surfaces of a fixed size.
+
+    Each image is decoded, scaled to fit the thumbnail box and stored under
+    ``cache_dir`` as a raw RGBA ``.npy`` array keyed by the file's content
+    hash. Later runs memory-map that array instead of decoding the PNG/JPEG
+    again. Surfaces are converted to the display's pixel format, so blitting
+    them needs no per-pixel conversion.
+    """
+
+    def __init__(self, cache_dir: str, box: Optional[tuple[int, int]] = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory for the cached pixels ("" disables the disk cache)
+            box: Tuple of (width, height) images are scaled to fit, or None to
+                keep their native size
+        """
+        self.directory = os.path.join(cache_dir, "images") if cache_dir else ""
+        self.box = box
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        box = f"{self.box[0]}x{self.box[1]}" if self.box else "native"
+        return os.path.join(self.directory, f"{key}-{box}-v{PIPELINE_VERSION}.npy")
+
+    def prepare(self, image: pygame.surface.Surface) -> pygame.surface.Surface:
+        """Scale a decoded image to the thumbnail box.
+
+        Args:
+            image: Decoded image surface
+
+        Returns:
+            32-bit surface with alpha, at most the size of the box
+        """
+        image = image.convert_alpha()
+        size = fit_size(image.get_size(), self.box)
+        if size != image.get_size():
+            image = pygame.transform.smoothscale(image, size)
+        return image
+
+    def _read(self, path: str) -> Optional[pygame.surface.Surface]:
+        try:
+            pixels = np.load(path, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        height, width = pixels.shape[:2]
+        return pygame.image.frombuffer(pixels, (width, height), "RGBA")
+
+    def _write(self, path: str, image: pygame.surface.Surface) -> None:
+        width, height = image.get_size()
+        pixels = np.frombuffer(
+            pygame.image.tobytes(image, "RGBA"), dtype=np.uint8
+        ).reshape(height, width, 4)
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            np.save(f, pixels)
+        os.replace(temp_path, path)
+
+    def load(
+        self,
+        content: bytes,
+        name: str = "",
+        key: Optional[str] = None,
+        original: Optional[pygame.surface.Surface] = None,
+    ) -> tuple[pygame.surface.Surface, str]:
+        """Get the display-ready surface for an image file's contents.
+
+        Args:
+            content: Bytes of the image file
+            name: File name, used as a hint for the image format
+            key: Content hash of ``content``, if the caller already has it
+            original: ``content`` already decoded, so a cache miss doesn't
+                decode it again
+
+        Returns:
+            Tuple of (surface, content hash)
+
+        Raises:
+            pygame.error: If the image could not be decoded
+        """
+        key = key or content_key(content)
+        path = self._path(key) if self.directory else ""
+
+        image = self._read(path) if path else None
+        if image is not None:
+            self.hits += 1
+            # Copy out of the mapped file into the display's pixel format
+            return image.convert_alpha(), key
+
+        self.misses += 1
+        if original is None:
+            original = pygame.image.load(io.BytesIO(content), name)
+        image = self.prepare(original)
+        if path:
+            try:
+                self._write(path, image)
+            except OSError as e:
+                print(f"Could not cache image {name}: {e}")
+        return image, key
@@ -0,0 +1,79 @@
+import pygame
+
+
+class LabelCache:
+    """Rendered text for one font and colour, cached by string.
+
+    Labels are rendered whole with font.render, so they keep the font's
+    kerning, and cached: value labels take a bounded set of values that
+    repeat across bars and frames, so most frames cost a blit instead of a
+    font render. Fixed strings such as timestamps are cached in full, value
+    labels in a least recently used cache of ``max_labels`` entries.
+    """
+
+    def __init__(
+        self, font: pygame.font.Font, color: tuple, max_labels: int = 4096
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            font: Font used to render text
+            color: RGB colour of the text
+            max_labels: Maximum number of value labels kept
+        """
+        self.font = font
+        self.color = color
+        self.max_labels = max_labels
+        self.strings: dict[str, pygame.surface.Surface] = {}
+        self.labels: dict[str, pygame.surface.Surface] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _cached(
+        self, cache: dict[str, pygame.surface.Surface], text: str
+    ) -> pygame.surface.Surface:
+        surface = cache.get(text)
+        if surface is None:
+            self.misses += 1
+            surface = self.font.render(text, True, self.color)
+            cache[text] = surface
+        else:
+            self.hits += 1
+        return surface
+
+    def string(self, text: str) -> pygame.surface.Surface:
+        """Get the rendered surface for a whole string."""
+        return self._cached(self.strings, text)
+
+    def label(
+        self, value: str, value_prepost: tuple[str, str] = ("", "")
+    ) -> pygame.surface.Surface:
+        """Get the rendered surface for a value label.
+
+        Args:
+            value: Changing part of the label
+            value_prepost: Tuple of (prefix, suffix) around the value
+
+        Returns:
+            Surface identical to rendering the label with font.render
+        """
+        prefix, suffix = value_prepost
+        text = prefix + value + suffix
+        surface = self.labels.pop(text, None)
+        if surface is None:
+            self.misses += 1
+            surface = self.font.render(text, True, self.color)
+            if len(self.labels) >= self.max_labels:
+                # Dicts keep insertion order, so the first key is the least
+                # recently used
+                del self.labels[next(iter(self.labels))]
+        else:
+            self.hits += 1
+        self.labels[text] = surface
+        return surface
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
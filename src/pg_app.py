@@ -1,7 +1,16 @@
+import os
+import time
+from typing import Optional
 import pygame
 from .color import Color
 from .super_rect import SuperRect
-from pygame_screen_record import ScreenRecorder, add_codec
+from .recorder import (
+    FFmpegRecorder,
+    OpenCVRecorder,
+    ScreenRecorderBackend,
+    SegmentRecorder,
+)
+from .profiler import NullProfiler, Profiler
 
 
 class Display:
@@ -9,9 +18,46 @@ class Display:
 
     def __init__(self, screen: pygame.surface.Surface):
         self.screen = screen
+        # Regions drawn this frame and last frame; anything outside them
+        # (background, header) is identical between frames.
+        self.dirty_rects: list[pygame.Rect] = []
+        self.previous_dirty_rects: list[pygame.Rect] = []
+        self.full_update = True
 
-    def update(self):
-        pygame.display.update()
+    def mark_dirty(self, rect: pygame.Rect) -> None:
+        """Record a region that changed this frame."""
+        if rect.width and rect.height:
+            self.dirty_rects.append(rect)
+
+    def invalidate(self) -> None:
+        """Push the whole surface on the next update."""
+        self.full_update = True
+
+    def blit(self, surface: pygame.surface.Surface, position) -> pygame.Rect:
+        rect = self.screen.blit(surface, position)
+        self.mark_dirty(rect)
+        return rect
+
+    def update(self) -> Optional[list[pygame.Rect]]:
+        """Push changed regions to the display.
+
+        Both this frame's and last frame's regions are updated, so content
+        that moved away from a region is erased on screen as well.
+
+        Returns:
+            Regions that differ from the previous frame, or None if the
+            whole surface was pushed
+        """
+        rects = None
+        if self.full_update:
+            pygame.display.update()
+            self.full_update = False
+        else:
+            rects = self.dirty_rects + self.previous_dirty_rects
+            pygame.display.update(rects)
+        self.previous_dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return rects
 
     def draw_rect_with_header(
         self,
@@ -35,7 +81,9 @@ class Display:
             header, header_color, header_render, header_rend_rect
         )
         for item in data:
-            pygame.draw.rect(self.screen, item.color.rgb(), item.as_rect())
+            self.mark_dirty(
+                pygame.draw.rect(self.screen, item.color.rgb(), item.as_rect())
+            )
 
     def draw_rect_text(
         self,
@@ -44,21 +92,22 @@ class Display:
     ):
         for item, draw in zip(data, to_draw):
             if draw:
-                self.screen.blit(item[0], item[1])
+                self.blit(item[0], item[1])
 
     def draw_continuous_numbers(
-        self, data: list[tuple[pygame.surface.Surface, pygame.rect.Rect, bool]]
+        self,
+        data: list[tuple[pygame.surface.Surface, pygame.rect.Rect, bool]],
     ):
         for render, rect, to_draw in data:
             if to_draw:
-                self.screen.blit(render, rect)
+                self.blit(render, rect)
 
     def draw_image_on_right(
         self, column: int, images: list[pygame.surface.Surface], position_data: list
     ):
         for img, obj in zip(images, position_data):
             if obj.width > 0:
-                self.screen.blit(img, (obj.right - 5 + column * 40, obj.centery - 25))
+                self.blit(img, (obj.right - 5 + column * 40, obj.centery - 25))
 
 
 class EventHandler:
@@ -85,12 +134,28 @@ class PgApp:
     def __init__(
         self,
         dimensions: tuple[int, int],
+        headless: bool = False,
+        encoder: str = "mp4v",
+        segment_frames: int = 0,
     ) -> None:
         """Initialize the game window and components.
 
         Args:
             dimensions: Tuple of (width, height) for window size
+            headless: Render on SDL's dummy video driver and step time by
+                exactly 1/fps per frame instead of following the wall clock
+            encoder: "mp4v" to record with pygame_screen_record (or, when
+                headless, to encode every frame with OpenCV as it is rendered),
+                or "libx264" to stream frames straight into an ffmpeg h264
+                encoder. Set ``recorder`` to a FrameRecorder to keep the
+                frames in memory instead
+            segment_frames: Record one frame per rendered frame into segments
+                of this many frames on disk, so memory stays constant and an
+                interrupted recording resumes where it stopped (0 disables)
         """
+        self.headless = headless
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
         pygame.init()
         self.width, self.height = dimensions
         self.screen = pygame.display.set_mode(dimensions, pygame.NOFRAME)
@@ -99,12 +164,90 @@ class PgApp:
         self.running = True
         self.t0: float = 0.0
         self.time_elapsed: float = 0.0
+        self.frame_index: int = 0
         self.fpsClock = pygame.time.Clock()
-        self.recorder = ScreenRecorder()
-        add_codec("mp4", "mp4v")
+        self.profiler = NullProfiler()
+        if segment_frames:
+            self.recorder = SegmentRecorder(segment_frames, encoder)
+        elif encoder == "libx264":
+            self.recorder = FFmpegRecorder()
+        elif headless:
+            self.recorder = OpenCVRecorder()
+        else:
+            self.recorder = ScreenRecorderBackend()
 
     def update_display(self):
-        self.display.update()
+        with self.profiler.phase("display"):
+            rects = self.display.update()
+        with self.profiler.phase("record"):
+            self.recorder.capture(self.screen, rects)
+
+    def hold_display(self):
+        """Show and record the frame on screen again without redrawing it.
+
+        Recorders repeat their last frame, which costs far less than
+        capturing an identical one.
+        """
+        if self.display.full_update:
+            with self.profiler.phase("display"):
+                self.display.update()
+        with self.profiler.phase("hold"):
+            self.recorder.repeat(self.screen)
+
+    def advance_clock(self, fps: int) -> None:
+        """Move the animation clock forward by one frame.
+
+        Headless apps derive the time from the frame counter so every run
+        produces the same frames as fast as the CPU allows. Windowed apps
+        throttle to ``fps`` and advance by the measured frame time.
+
+        Args:
+            fps: Target frames per second
+        """
+        self.frame_index += 1
+        if self.headless:
+            self.time_elapsed = self.frame_index / fps
+        else:
+            with self.profiler.phase("clock"):
+                self.fpsClock.tick(fps)
+            self.time_elapsed += time.time() - self.t0
+
+    def start_profiling(self, trace_allocations: bool = False) -> None:
+        """Record the time spent in each phase of every frame from now on.
+
+        Args:
+            trace_allocations: Also record the bytes each phase allocates
+        """
+        self.profiler = Profiler(trace_allocations)
+
+    def finish_profiling(self, path: str) -> None:
+        """Print the per-phase report and save the run as a Chrome trace.
+
+        Args:
+            path: Output JSON file
+        """
+        if self.profiler.enabled:
+            print(self.profiler.report())
+            self.profiler.save(path)
+            self.profiler = NullProfiler()
+
+    def start_recording(self, path: str, fps: int, fingerprint: str = "") -> int:
+        """Start recording to a file.
+
+        Args:
+            path: Output video file
+            fps: Frame rate of the output video
+            fingerprint: Identifies the chart being recorded; a segmented
+                recording only resumes from segments of the same chart
+
+        Returns:
+            Number of frames an interrupted segmented recording already holds;
+            the caller continues from that frame
+        """
+        return self.recorder.start(path, fps, fingerprint) or 0
+
+    def finish_recording(self) -> None:
+        self.recorder.finish()
 
     def draw_data_rects(self, *args, **kwargs):
         self.display.draw_data_rects(*args, **kwargs)
@@ -119,7 +262,9 @@ class PgApp:
         self.display.draw_image_on_right(*args, **kwargs)
 
     def kill_switch(self, event: pygame.event.EventType) -> None:
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.display.invalidate()
         self.event_handler.handle_event(event)
         self.running = self.event_handler.running
         if not self.running:
-            self.recorder.stop_rec()
+            self.recorder.abort()
@@ -0,0 +1,173 @@
+import contextlib
+import json
+import time
+import tracemalloc
+import numpy as np
+
+# Reusable context manager for phases that aren't recorded
+NULL_PHASE = contextlib.nullcontext()
+
+
+class NullProfiler:
+    """Profiler that records nothing; the default, so phases cost next to nothing."""
+
+    enabled = False
+
+    def phase(self, name: str) -> contextlib.AbstractContextManager:
+        """Time a phase of the current frame (not recorded)."""
+        return NULL_PHASE
+
+    def frame(self) -> contextlib.AbstractContextManager:
+        """Time a whole frame (not recorded)."""
+        return NULL_PHASE
+
+
+class Profiler:
+    """Records wall time, call counts and allocations of render loop phases.
+
+    Every phase call becomes an event tagged with the frame it ran in, so the
+    run can be summarised per phase or written as a Chrome trace.
+    """
+
+    enabled = True
+
+    def __init__(self, trace_allocations: bool = False) -> None:
+        """Initialize the profiler.
+
+        Args:
+            trace_allocations: Also record the net bytes each phase allocates
+                with tracemalloc (slows rendering down noticeably)
+        """
+        self.trace_allocations = trace_allocations
+        self.t0 = time.perf_counter()
+        self.current_frame = -1
+        # (name, frame, start, duration, allocated bytes) per phase call
+        self.events: list[tuple[str, int, float, float, int]] = []
+        # Only a trace this profiler started is stopped again in save()
+        self._started_tracing = False
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """Time a phase of the current frame.
+
+        Args:
+            name: Phase name, e.g. "animate"
+        """
+        allocated = tracemalloc.get_traced_memory()[0] if self.trace_allocations else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            if self.trace_allocations:
+                allocated = tracemalloc.get_traced_memory()[0] - allocated
+            self.events.append(
+                (name, self.current_frame, start - self.t0, duration, allocated)
+            )
+
+    @contextlib.contextmanager
+    def frame(self):
+        """Time a whole frame; phases inside it are tagged with its index."""
+        self.current_frame += 1
+        with self.phase("frame"):
+            yield
+
+    def summary(self) -> dict:
+        """Summarise the recorded phases.
+
+        Returns:
+            Dict with the frame count and, per phase, its call count, total
+            seconds, per-frame milliseconds (mean, p50, p99, max), share of
+            the frame time and net allocated bytes
+        """
+        frames = self.current_frame + 1
+        names = list(dict.fromkeys(event[0] for event in self.events))
+        frame_time = sum(event[3] for event in self.events if event[0] == "frame")
+        phases = {}
+        for name in names:
+            events = [event for event in self.events if event[0] == name]
+            per_frame = np.zeros(max(frames, 1))
+            for _, frame, _, duration, _ in events:
+                per_frame[max(frame, 0)] += duration
+            total = per_frame.sum()
+            p50, p99 = np.percentile(per_frame, [50, 99]) * 1000
+            phases[name] = {
+                "calls": len(events),
+                "total_s": round(total, 6),
+                "mean_ms": round(total / max(frames, 1) * 1000, 4),
+                "p50_ms": round(p50, 4),
+                "p99_ms": round(p99, 4),
+                "max_ms": round(per_frame.max() * 1000, 4),
+                "share": round(total / frame_time, 4) if frame_time else None,
+                "allocated_bytes": (
+                    sum(event[4] for event in events)
+                    if self.trace_allocations
+                    else None
+                ),
+            }
+        return {"frames": frames, "phases": phases}
+
+    def report(self) -> str:
+        """Format the summary as a table, slowest phase first."""
+        summary = self.summary()
+        lines = [
+            f"{summary['frames']} frames",
+            f"{'phase':<16} {'calls':>8} {'total s':>9} {'mean ms':>9} "
+            f"{'p99 ms':>9} {'max ms':>9} {'share':>7}",
+        ]
+        phases = sorted(summary["phases"].items(), key=lambda item: -item[1]["total_s"])
+        for name, phase in phases:
+            share = f"{phase['share']:.1%}" if phase["share"] is not None else "-"
+            lines.append(
+                f"{name:<16} {phase['calls']:>8} {phase['total_s']:>9.3f} "
+                f"{phase['mean_ms']:>9.3f} {phase['p99_ms']:>9.3f} "
+                f"{phase['max_ms']:>9.3f} {share:>7}"
+            )
+            if phase["allocated_bytes"] is not None:
+                lines[-1] += f" {phase['allocated_bytes']:>12} B"
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> dict:
+        """Get the events in Chrome's trace event format.
+
+        The result opens in chrome://tracing or https://ui.perfetto.dev; the
+        summary is kept under "otherData".
+        """
+        events = []
+        for name, frame, start, duration, allocated in self.events:
+            args = {"frame": frame}
+            if self.trace_allocations:
+                args["allocated_bytes"] = allocated
+            events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": round(start * 1e6, 3),
+                    "dur": round(duration * 1e6, 3),
+                    "pid": 1,
+                    "tid": 1,
+                    "args": args,
+                }
+            )
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": self.summary(),
+        }
+
+    def save(self, path: str) -> None:
+        """Write the run as a Chrome trace JSON file.
+
+        Memory tracing is stopped if this profiler started it.
+
+        Args:
+            path: Output file
+        """
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
@@ -0,0 +1,693 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+from typing import Iterator, Optional
+import cv2
+import pygame
+from pygame_screen_record import ScreenRecorder, add_codec
+
+
+class ScreenRecorderBackend:
+    """Wall-clock recorder backed by pygame_screen_record's capture thread."""
+
+    def __init__(self) -> None:
+        self.recorder = ScreenRecorder()
+        self.path = ""
+        add_codec("mp4", "mp4v")
+
+    def start(self, path: str, fps: int, fingerprint: str = "") -> None:
+        """Start capturing the display in the background.
+
+        Args:
+            path: Output file to write when the recording is finished
+            fps: Frames per second to capture
+            fingerprint: Identifies the chart (unused, every recording
+                starts over)
+        """
+        self.path = path
+        self.recorder.start_rec(fps)
+
+    def capture(
+        self,
+        surface: pygame.surface.Surface,
+        rects: Optional[list[pygame.Rect]] = None,
+    ) -> None:
+        """Frames are grabbed by the capture thread, nothing to do per frame."""
+
+    def repeat(self, surface: pygame.surface.Surface) -> None:
+        """Frames are grabbed by the capture thread, nothing to do per frame."""
+
+    def finish(self) -> None:
+        """Stop capturing and write the recording to disk."""
+        self.recorder.stop_rec().save_recording(self.path)
+
+    def abort(self) -> None:
+        """Stop capturing without writing anything."""
+        self.recorder.stop_rec()
+
+
+class FrameRecorder:
+    """Recorder that keeps one frame for every rendered frame in memory.
+
+    For callers that want the frames themselves. A frame whose changed
+    regions are known is stored as patches over the frame before it, so
+    memory grows with what changed rather than with the screen size. The
+    recording is encoded with mp4v when it is finished and its frames can
+    be replayed until the next recording starts.
+    """
+
+    def __init__(self) -> None:
+        # Full frames (surfaces) or lists of (rect, patch) tuples
+        self.recording: Optional[list] = None
+        self.recording_active = False
+        self.path = ""
+        self.fps = 0
+
+    def start(self, path: str, fps: int, fingerprint: str = "") -> None:
+        """Start a new in-memory recording.
+
+        Args:
+            path: Output file to write when the recording is finished
+            fps: Frame rate of the output video
+            fingerprint: Identifies the chart (unused, every recording
+                starts over)
+        """
+        self.path = path
+        self.fps = fps
+        self.recording = []
+        self.recording_active = True
+
+    def capture(
+        self,
+        surface: pygame.surface.Surface,
+        rects: Optional[list[pygame.Rect]] = None,
+    ) -> None:
+        """Add the surface to the running recording.
+
+        Args:
+            surface: Surface holding the finished frame
+            rects: Regions that changed since the last frame, or None if
+                any of it may have; only those are copied
+        """
+        if not self.recording_active:
+            return
+        if rects is None or not self.recording:
+            self.recording.append(surface.copy())
+            return
+        bounds = surface.get_rect()
+        patches = []
+        for rect in rects:
+            rect = rect.clip(bounds)
+            if rect.width and rect.height:
+                patches.append((rect, surface.subsurface(rect).copy()))
+        self.recording.append(patches)
+
+    def repeat(self, surface: pygame.surface.Surface) -> None:
+        """Add the last frame again; a held frame costs no pixels.
+
+        Args:
+            surface: Surface holding the unchanged frame
+        """
+        if not self.recording_active:
+            return
+        if self.recording:
+            self.recording.append([])
+        else:
+            self.capture(surface)
+
+    def _replay(self) -> Iterator[tuple[pygame.surface.Surface, list]]:
+        frame = None
+        for entry in self.recording or []:
+            if isinstance(entry, pygame.Surface):
+                frame = entry.copy()
+                yield frame, None
+            else:
+                for rect, patch in entry:
+                    frame.blit(patch, rect)
+                yield frame, [rect for rect, _ in entry]
+
+    def frames(self) -> Iterator[pygame.surface.Surface]:
+        """Replay the running or last finished recording one frame at a time.
+
+        Yields:
+            The same surface for every frame, updated in place; copy it to
+            keep a frame
+        """
+        for frame, _ in self._replay():
+            yield frame
+
+    def finish(self) -> None:
+        """Encode the recording and write it to disk, keeping its frames."""
+        if not self.recording_active:
+            return
+        self.recording_active = False
+        writer = OpenCVRecorder()
+        writer.start(self.path, self.fps)
+        for frame, rects in self._replay():
+            writer.capture(frame, rects)
+        writer.finish()
+
+    def abort(self) -> None:
+        """Drop the running recording without writing anything."""
+        self.recording = None
+        self.recording_active = False
+
+
+def ffmpeg_pixel_format(surface: pygame.surface.Surface) -> Optional[str]:
+    """Name the ffmpeg rawvideo pixel format matching a surface's memory layout.
+
+    Args:
+        surface: Surface whose pixel buffer will be sent to ffmpeg
+
+    Returns:
+        ffmpeg ``pix_fmt`` string, or None if the buffer can't be sent as is
+    """
+    bytesize = surface.get_bytesize()
+    if bytesize not in (3, 4) or surface.get_pitch() != surface.get_width() * bytesize:
+        return None
+
+    order = ["0"] * bytesize
+    for channel, mask, shift in zip("rgba", surface.get_masks(), surface.get_shifts()):
+        if not mask:
+            continue
+        position = shift // 8
+        if sys.byteorder == "big":
+            position = bytesize - 1 - position
+        order[position] = channel
+
+    if bytesize == 3:
+        return {"rgb": "rgb24", "bgr": "bgr24"}.get("".join(order))
+    pix_fmt = "".join(order)
+    supported = ("rgba", "bgra", "argb", "abgr", "rgb0", "bgr0", "0rgb", "0bgr")
+    return pix_fmt if pix_fmt in supported else None
+
+
+class FFmpegRecorder:
+    """Recorder that streams every frame into an ffmpeg libx264 encoder.
+
+    The surface's pixel buffer is written to ffmpeg's stdin directly, so
+    frames are neither copied nor buffered in Python and the h264 file is
+    produced in a single pass.
+    """
+
+    def __init__(self, preset: str = "medium", crf: int = 23) -> None:
+        """Initialize the encoder settings.
+
+        Args:
+            preset: libx264 encoding speed preset
+            crf: libx264 quality (lower = better, 18-28 is good range)
+        """
+        self.preset = preset
+        self.crf = crf
+        self.process: Optional[subprocess.Popen] = None
+        self.path = ""
+        self.pix_fmt: Optional[str] = None
+
+    def command(self, size: tuple[int, int], fps: int) -> list[str]:
+        """Build the ffmpeg command line for a recording.
+
+        Args:
+            size: Frame dimensions in pixels
+            fps: Frame rate of the output video
+
+        Returns:
+            Argument list for subprocess
+        """
+        return [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            self.pix_fmt or "rgb24",
+            "-s",
+            f"{size[0]}x{size[1]}",
+            "-framerate",
+            str(fps),
+            "-i",
+            "-",
+            "-c:v",
+            "libx264",
+            "-preset",
+            self.preset,
+            "-crf",
+            str(self.crf),
+            "-pix_fmt",
+            "yuv420p",
+            "-movflags",
+            "+faststart",
+            "-y",
+            self.path,
+        ]
+
+    def start(self, path: str, fps: int, fingerprint: str = "") -> None:
+        """Launch the ffmpeg encoder.
+
+        Args:
+            path: Output video file
+            fps: Frame rate of the output video
+            fingerprint: Identifies the chart (unused, every recording
+                starts over)
+
+        Raises:
+            RuntimeError: If ffmpeg is not installed
+        """
+        surface = pygame.display.get_surface()
+        self.path = path
+        self.pix_fmt = ffmpeg_pixel_format(surface)
+        try:
+            self.process = subprocess.Popen(
+                self.command(surface.get_size(), fps),
+                stdin=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        except FileNotFoundError as e:
+            raise RuntimeError("FFmpeg is not installed or not in system PATH.") from e
+
+    def capture(
+        self,
+        surface: pygame.surface.Surface,
+        rects: Optional[list[pygame.Rect]] = None,
+    ) -> None:
+        """Send the surface's pixels to the encoder.
+
+        The rawvideo stream takes whole frames and the surface's buffer is
+        written without a copy, so the changed regions are of no use here.
+
+        Args:
+            surface: Surface holding the finished frame
+            rects: Regions that changed since the last frame (ignored)
+
+        Raises:
+            RuntimeError: If ffmpeg exited before the recording was finished
+        """
+        if self.process is None:
+            return
+        try:
+            if self.pix_fmt:
+                # The view is released as soon as write returns, unlocking the surface
+                self.process.stdin.write(surface.get_view("0"))
+            else:
+                self.process.stdin.write(pygame.image.tobytes(surface, "RGB"))
+        except BrokenPipeError as e:
+            # ffmpeg is gone; its error output says why
+            _, stderr = self.process.communicate()
+            self.process = None
+            raise self._failure(stderr) from e
+
+    def repeat(self, surface: pygame.surface.Surface) -> None:
+        """Send the unchanged frame again.
+
+        The rawvideo stream needs every frame, but the buffer is written as
+        is and libx264 encodes a repeated frame almost for free.
+
+        Args:
+            surface: Surface holding the unchanged frame
+        """
+        self.capture(surface)
+
+    def finish(self) -> None:
+        """Flush the remaining frames and wait for the encoder to exit.
+
+        Raises:
+            RuntimeError: If ffmpeg failed to encode the video
+        """
+        if self.process is None:
+            return
+        _, stderr = self.process.communicate()
+        returncode = self.process.returncode
+        self.process = None
+        if returncode != 0:
+            raise self._failure(stderr)
+
+    def _failure(self, stderr: bytes) -> RuntimeError:
+        return RuntimeError(
+            f"FFmpeg failed to encode {self.path}: {stderr.decode(errors='ignore')}"
+        )
+
+    def abort(self) -> None:
+        """Stop the encoder and remove the partial output."""
+        if self.process is None:
+            return
+        self.process.kill()
+        self.process.communicate()
+        self.process = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class OpenCVRecorder:
+    """Recorder that streams every frame into an OpenCV mp4v video writer.
+
+    Produces the same video as FrameRecorder, but frames are encoded as they
+    arrive instead of being kept in memory until the end.
+    """
+
+    def __init__(self) -> None:
+        self.writer: Optional[cv2.VideoWriter] = None
+        self.path = ""
+        # Last frame in OpenCV's layout, kept to repeat held frames
+        self.frame = None
+
+    def start(self, path: str, fps: int, fingerprint: str = "") -> None:
+        """Open the video writer.
+
+        Args:
+            path: Output video file
+            fps: Frame rate of the output video
+            fingerprint: Identifies the chart (unused, every recording
+                starts over)
+        """
+        self.path = path
+        self.writer = cv2.VideoWriter(
+            os.path.abspath(path),
+            cv2.VideoWriter_fourcc(*"mp4v"),
+            fps,
+            pygame.display.get_surface().get_size(),
+        )
+
+    def capture(
+        self,
+        surface: pygame.surface.Surface,
+        rects: Optional[list[pygame.Rect]] = None,
+    ) -> None:
+        """Encode the surface as the next frame.
+
+        The encoder needs the whole frame, but only the changed regions of
+        the last converted frame are converted again.
+
+        Args:
+            surface: Surface holding the finished frame
+            rects: Regions that changed since the last frame, or None if
+                any of it may have
+        """
+        if self.writer is None:
+            return
+        pixels = pygame.surfarray.pixels3d(surface)
+        if rects is None or self.frame is None:
+            self.frame = cv2.cvtColor(pixels.swapaxes(0, 1), cv2.COLOR_RGB2BGR)
+        else:
+            for rect in rects:
+                rect = rect.clip(surface.get_rect())
+                region = pixels[rect.left : rect.right, rect.top : rect.bottom]
+                self.frame[rect.top : rect.bottom, rect.left : rect.right] = (
+                    region.swapaxes(0, 1)[..., ::-1]
+                )
+        del pixels  # unlock the surface
+        self.writer.write(self.frame)
+
+    def repeat(self, surface: pygame.surface.Surface) -> None:
+        """Encode the last frame again without converting the surface.
+
+        Args:
+            surface: Surface holding the unchanged frame
+        """
+        if self.frame is None:
+            self.capture(surface)
+        elif self.writer is not None:
+            self.writer.write(self.frame)
+
+    def finish(self) -> None:
+        """Close the video file."""
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+            self.frame = None
+
+    def abort(self) -> None:
+        """Close the video writer and remove the partial output."""
+        if self.writer is None:
+            return
+        self.finish()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def concat_segments(paths: list[str], output: str) -> None:
+    """Join encoded segments into one video without re-encoding.
+
+    Args:
+        paths: Segment files in playback order
+        output: Output video file
+
+    Raises:
+        RuntimeError: If ffmpeg failed to join the segments
+    """
+    list_path = os.path.join(os.path.dirname(paths[0]), "segments.txt")
+    with open(list_path, "w") as f:
+        for path in paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    process = subprocess.run(
+        [
+            "ffmpeg",
+            "-loglevel",
+            "error",
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            list_path,
+            "-c",
+            "copy",
+            "-movflags",
+            "+faststart",
+            "-y",
+            output,
+        ],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"FFmpeg failed to join segments: {process.stderr}")
+
+
+def transcode_segments(paths: list[str], output: str, fps: int) -> None:
+    """Join mp4v segments by decoding and re-encoding them frame by frame.
+
+    Used when ffmpeg isn't installed; only one frame is in memory at a time.
+
+    Args:
+        paths: Segment files in playback order
+        output: Output video file
+        fps: Frame rate of the output video
+    """
+    writer = None
+    try:
+        for path in paths:
+            capture = cv2.VideoCapture(path)
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                if writer is None:
+                    size = (frame.shape[1], frame.shape[0])
+                    writer = cv2.VideoWriter(
+                        output, cv2.VideoWriter_fourcc(*"mp4v"), fps, size
+                    )
+                writer.write(frame)
+            capture.release()
+    finally:
+        if writer is not None:
+            writer.release()
+
+
+class SegmentRecorder:
+    """Recorder that writes fixed-size video segments to disk while rendering.
+
+    Segments go to ``<path>.segments/`` and every finished one is listed in
+    a manifest, so memory stays constant however long the video is and an
+    interrupted render keeps everything but the segment in progress. A later
+    recording of the same chart to the same path with the same settings
+    resumes after the last finished segment; the segments are joined into ``path`` once the
+    recording is finished.
+    """
+
+    # Bump when the manifest layout changes so old segments are discarded
+    MANIFEST_VERSION = 2
+
+    def __init__(self, segment_frames: int = 600, encoder: str = "mp4v") -> None:
+        """Initialize the recorder.
+
+        Args:
+            segment_frames: Frames per segment
+            encoder: "mp4v" to encode segments with OpenCV, or "libx264" to
+                encode them with ffmpeg
+        """
+        self.segment_frames = segment_frames
+        self.encoder = encoder
+        self.path = ""
+        self.directory = ""
+        self.fps = 0
+        self.manifest: dict = {}
+        self.writer = None
+        self.writer_path = ""
+        self.frames_in_segment = 0
+
+    def _settings(self, fps: int, fingerprint: str) -> dict:
+        """Settings segments must share to be joined into one video."""
+        return {
+            "version": self.MANIFEST_VERSION,
+            "chart": fingerprint,
+            "fps": fps,
+            "size": list(pygame.display.get_surface().get_size()),
+            "segment_frames": self.segment_frames,
+            "encoder": self.encoder,
+        }
+
+    def _read_manifest(self, settings: dict) -> Optional[dict]:
+        """Load the manifest of an earlier recording with the same settings."""
+        try:
+            with open(os.path.join(self.directory, "manifest.json"), "r") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get("settings") != settings:
+            return None
+        for segment in manifest["segments"]:
+            if not os.path.exists(os.path.join(self.directory, segment["file"])):
+                return None
+        return manifest
+
+    def _write_manifest(self) -> None:
+        manifest_path = os.path.join(self.directory, "manifest.json")
+        with open(f"{manifest_path}.tmp", "w") as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(f"{manifest_path}.tmp", manifest_path)
+
+    @property
+    def recorded_frames(self) -> int:
+        """Number of frames in finished segments."""
+        return sum(segment["frames"] for segment in self.manifest["segments"])
+
+    def start(self, path: str, fps: int, fingerprint: str = "") -> int:
+        """Start recording, resuming an interrupted recording to the same path.
+
+        Segments are only kept if they were recorded with the same settings
+        from the same chart.
+
+        Args:
+            path: Output video file
+            fps: Frame rate of the output video
+            fingerprint: Identifies the chart being recorded
+
+        Returns:
+            Number of frames already recorded, which the caller should skip
+        """
+        self.path = path
+        self.fps = fps
+        self.directory = f"{path}.segments"
+        settings = self._settings(fps, fingerprint)
+        manifest = self._read_manifest(settings)
+        if manifest is None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            manifest = {"settings": settings, "segments": []}
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Drop the segment that was in progress when the render stopped
+        listed = {segment["file"] for segment in manifest["segments"]}
+        for name in os.listdir(self.directory):
+            if name.startswith("segment_") and name not in listed:
+                os.remove(os.path.join(self.directory, name))
+
+        self.manifest = manifest
+        self._write_manifest()
+        return self.recorded_frames
+
+    def _open_segment(self) -> None:
+        index = len(self.manifest["segments"])
+        self.writer_path = os.path.join(self.directory, f"segment_{index:05d}.mp4")
+        self.writer = (
+            FFmpegRecorder() if self.encoder == "libx264" else OpenCVRecorder()
+        )
+        # Written under a temporary name, so only complete segments are listed
+        self.writer.start(f"{self.writer_path[:-4]}.part.mp4", self.fps)
+        self.frames_in_segment = 0
+
+    def _close_segment(self) -> None:
+        self.writer.finish()
+        os.replace(f"{self.writer_path[:-4]}.part.mp4", self.writer_path)
+        self.manifest["segments"].append(
+            {
+                "file": os.path.basename(self.writer_path),
+                "start": self.recorded_frames,
+                "frames": self.frames_in_segment,
+            }
+        )
+        self._write_manifest()
+        self.writer = None
+
+    def capture(
+        self,
+        surface: pygame.surface.Surface,
+        rects: Optional[list[pygame.Rect]] = None,
+    ) -> None:
+        """Encode the surface into the current segment.
+
+        Args:
+            surface: Surface holding the finished frame
+            rects: Regions that changed since the last frame, or None if
+                any of it may have
+        """
+        self._record(surface, rects, repeat=False)
+
+    def repeat(self, surface: pygame.surface.Surface) -> None:
+        """Repeat the last frame in the current segment.
+
+        Args:
+            surface: Surface holding the unchanged frame
+        """
+        self._record(surface, None, repeat=True)
+
+    def _record(
+        self,
+        surface: pygame.surface.Surface,
+        rects: Optional[list[pygame.Rect]],
+        repeat: bool,
+    ) -> None:
+        if not self.directory:
+            return
+        if self.writer is None:
+            self._open_segment()
+        if repeat:
+            self.writer.repeat(surface)
+        else:
+            # A new segment's writer has no earlier frame to patch and
+            # converts the whole surface
+            self.writer.capture(surface, rects)
+        self.frames_in_segment += 1
+        if self.frames_in_segment == self.segment_frames:
+            self._close_segment()
+
+    def finish(self) -> None:
+        """Close the last segment and join all segments into the output.
+
+        Raises:
+            RuntimeError: If ffmpeg failed to encode or join the segments
+        """
+        if not self.directory:
+            return
+        if self.writer is not None:
+            self._close_segment()
+        paths = [
+            os.path.join(self.directory, segment["file"])
+            for segment in self.manifest["segments"]
+        ]
+        if paths:
+            if shutil.which("ffmpeg"):
+                concat_segments(paths, self.path)
+            else:
+                transcode_segments(paths, self.path, self.fps)
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory = ""
+
+    def abort(self) -> None:
+        """Stop recording, keeping the finished segments to resume from."""
+        if self.writer is not None:
+            self.writer.abort()
+            self.writer = None
+        self.directory = ""
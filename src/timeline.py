@@ -0,0 +1,79 @@
+import numpy as np
+
+
+class BarTimeline:
+    """Precomputed value and rank of every bar at every timepoint.
+
+    Bars are indexed in a fixed order (columns of the arrays) and
+    timepoints by step (rows), so the state of any frame is a couple of
+    array operations instead of sorting and looking up the chart data.
+    """
+
+    def __init__(
+        self, values: np.ndarray, positions: np.ndarray, view_height: int
+    ) -> None:
+        """Build the timeline.
+
+        Args:
+            values: Array of shape (timepoints, bars) with each bar's value
+            positions: Y coordinate of each rank slot, best rank first
+            view_height: Height of the screen; slots starting below it are hidden
+        """
+        self.values = values
+        self.positions = positions
+        self.time_points, self.num_bars = values.shape
+
+        # Bars are re-sorted from the previous order at every step, so bars
+        # with equal values keep their relative order instead of swapping.
+        self.orders = np.empty(values.shape, dtype=np.int32)
+        self.ranks = np.empty(values.shape, dtype=np.int32)
+        slots = np.arange(self.num_bars, dtype=np.int32)
+        order = slots
+        for step in range(self.time_points):
+            if step:
+                order = order[np.argsort(-values[step, order], kind="stable")]
+            self.orders[step] = order
+            self.ranks[step, order] = slots
+
+        # A bar is on screen during the transition into a step if it is in
+        # one of the visible slots at either end of the transition. The first
+        # hidden slot counts as visible too, because a transition can run a
+        # fraction of a frame past its end and nudge a bar across the edge.
+        visible_slots = np.count_nonzero(positions.astype(int) < view_height) + 1
+        self.active: list[np.ndarray] = []
+        self.label_orders: list[np.ndarray] = []
+        for step in range(self.time_points):
+            on_screen = self.ranks[step] < visible_slots
+            if step:
+                on_screen |= self.ranks[step - 1] < visible_slots
+            self.active.append(np.flatnonzero(on_screen))
+            order = self.orders[step]
+            self.label_orders.append(order[on_screen[order]])
+
+    def _endpoints(self, step: int, bars: np.ndarray) -> tuple[np.ndarray, ...]:
+        """Start and end values and positions of the transition into a step."""
+        end_values = self.values[step, bars]
+        end_y = self.positions[self.ranks[step, bars]]
+        if step == 0:
+            return np.zeros(len(bars)), end_values, end_y, end_y
+        start_y = self.positions[self.ranks[step - 1, bars]]
+        return self.values[step - 1, bars], end_values, start_y, end_y
+
+    def interpolate(
+        self, step: int, elapsed: float, duration: float, bars: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Interpolate bar values and top edges during a transition.
+
+        Args:
+            step: Timepoint being animated towards
+            elapsed: Time since the transition started
+            duration: Duration of the transition
+            bars: Indices of the bars to interpolate
+
+        Returns:
+            Tuple of (values, integer top coordinates), one entry per bar
+        """
+        start_values, end_values, start_y, end_y = self._endpoints(step, bars)
+        values = start_values + (end_values - start_values) / duration * elapsed
+        tops = (start_y + (end_y - start_y) / duration * elapsed).astype(int)
+        return values, tops
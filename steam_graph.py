@@ -1,4 +1,11 @@
+import argparse
 from projects.Steam.most_positive_reviews import main
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Render the Steam reviews video.")
+    parser.add_argument(
+        "--contact-sheet",
+        metavar="PNG",
+        help="Render the chart's final frame to a PNG instead of the video",
+    )
+    main(parser.parse_args().contact_sheet)
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from projects.Steam.header_images import download_header_images
+
+IMAGE = b"\xff\xd8\xff\xe0" + bytes(range(256)) * 64
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves header images the way the Steam CDN can fail.
+
+    /ok/<name>  200 with the image after a short delay
+    /flaky      503 on the first request, 200 after that
+    /slow       200, but only after the client's timeout
+    /drop       Promises the whole image, sends half and hangs up
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests[self.path] = server.requests.get(self.path, 0) + 1
+            attempt = server.requests[self.path]
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            if self.path.startswith("/ok/"):
+                time.sleep(0.05)
+                self.send_image(IMAGE)
+            elif self.path == "/flaky" and attempt == 1:
+                self.send_response(503)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            elif self.path == "/flaky":
+                self.send_image(IMAGE)
+            elif self.path == "/slow":
+                time.sleep(1)
+                self.send_image(IMAGE)
+            elif self.path == "/drop":
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(IMAGE)))
+                self.end_headers()
+                self.wfile.write(IMAGE[: len(IMAGE) // 2])
+                self.wfile.flush()
+                self.close_connection = True
+            else:
+                self.send_error(404)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up on /slow
+            pass
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def send_image(self, body: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    httpd.daemon_threads = True
+    httpd.lock = threading.Lock()
+    httpd.requests = {}
+    httpd.in_flight = 0
+    httpd.max_in_flight = 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def url(server, path: str) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_downloads_concurrently_within_the_pool_size(server, tmp_path):
+    images = [(str(app_id), url(server, f"/ok/{app_id}.jpg")) for app_id in range(12)]
+
+    paths = download_header_images(images, str(tmp_path), workers=3, timeout=2)
+
+    assert paths == [str(tmp_path / f"{app_id}.jpg") for app_id in range(12)]
+    for path in paths:
+        with open(path, "rb") as f:
+            assert f.read() == IMAGE
+    assert 1 < server.max_in_flight <= 3
+    assert sorted(os.listdir(tmp_path)) == sorted(f"{i}.jpg" for i in range(12))
+
+
+def test_skips_images_already_downloaded(server, tmp_path):
+    images = [("1", url(server, "/ok/1.jpg"))]
+    download_header_images(images, str(tmp_path), timeout=2)
+    download_header_images(images, str(tmp_path), timeout=2)
+
+    assert server.requests == {"/ok/1.jpg": 1}
+
+
+def test_retries_server_errors(server, tmp_path):
+    paths = download_header_images(
+        [("7", url(server, "/flaky"))], str(tmp_path), retries=2, timeout=2
+    )
+
+    with open(paths[0], "rb") as f:
+        assert f.read() == IMAGE
+    assert server.requests["/flaky"] == 2
+
+
+def test_failed_transfers_leave_no_files(server, tmp_path, capsys):
+    images = [
+        ("1", url(server, "/ok/1.jpg")),
+        ("2", url(server, "/drop")),
+        ("3", url(server, "/slow")),
+    ]
+
+    paths = download_header_images(
+        images, str(tmp_path), workers=3, retries=1, timeout=0.3
+    )
+
+    assert os.listdir(tmp_path) == ["1.jpg"]
+    assert not os.path.exists(paths[1]) and not os.path.exists(paths[2])
+    # The timed out request was retried once
+    assert server.requests["/slow"] == 2
+    output = capsys.readouterr().out
+    assert "app_id 2" in output and "app_id 3" in output
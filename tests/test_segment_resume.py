@@ -0,0 +1,107 @@
+import json
+import os
+import cv2
+import numpy as np
+import pygame
+import pytest
+from src.animated_graph import BarChartAnimation, PygameExtended
+from src.benchmark import benchmark_config, synthetic_data
+from src.color import Color
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SEGMENT_FRAMES = 20
+
+
+@pytest.fixture(autouse=True)
+def repo_root(monkeypatch):
+    # The benchmark config loads its font relative to the repository
+    monkeypatch.chdir(ROOT)
+
+
+def render(path: str, seed: int = 0, bg_color: str = "#28282e", stop_at: int = 0):
+    """Run a segmented bar chart render, pressing ESC after ``stop_at`` frames.
+
+    Returns:
+        Tuple of (frames drawn by this run, frames of a full run)
+    """
+    app = PygameExtended((320, 180), headless=True, segment_frames=SEGMENT_FRAMES)
+    config = benchmark_config(10, "bottom_up", 0.1)
+    config.bg_color = Color(bg_color)
+    config.record_path = path
+    chart = BarChartAnimation(
+        pygame_app=app,
+        chart_data=synthetic_data(30, 8, seed),
+        header_height=40,
+        chart_config=config,
+    )
+
+    drawn = []
+    render_frame = chart.render_frame
+
+    def counting_render_frame(*args):
+        drawn.append(app.frame_index)
+        if stop_at and app.frame_index == stop_at:
+            pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_ESCAPE))
+        return render_frame(*args)
+
+    chart.render_frame = counting_render_frame
+    chart.run()
+    total = chart.frame_count()
+    pygame.quit()
+    return drawn, total
+
+
+def read_frames(path: str) -> list[np.ndarray]:
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+
+def assert_same_video(path: str, expected: str) -> None:
+    frames, expected_frames = read_frames(path), read_frames(expected)
+    assert len(frames) == len(expected_frames)
+    for frame, expected_frame in zip(frames, expected_frames):
+        assert np.array_equal(frame, expected_frame)
+
+
+def recorded_frames(path: str) -> int:
+    with open(f"{path}.segments/manifest.json") as f:
+        manifest = json.load(f)
+    return sum(segment["frames"] for segment in manifest["segments"])
+
+
+def test_resumes_after_the_last_finished_segment(tmp_path):
+    expected = str(tmp_path / "expected.mp4")
+    _, total = render(expected)
+    path = str(tmp_path / "chart.mp4")
+
+    render(path, stop_at=95)
+    assert not os.path.exists(path)
+    assert recorded_frames(path) == 95 // SEGMENT_FRAMES * SEGMENT_FRAMES
+
+    drawn, _ = render(path)
+    assert drawn[0] == 80 and len(drawn) == total - 80
+    assert not os.path.exists(f"{path}.segments")
+    assert_same_video(path, expected)
+
+
+@pytest.mark.parametrize(
+    "changes", [{"seed": 1}, {"bg_color": "#000000"}], ids=["data", "config"]
+)
+def test_changed_chart_starts_over(tmp_path, changes):
+    expected = str(tmp_path / "expected.mp4")
+    _, total = render(expected, **changes)
+    path = str(tmp_path / "chart.mp4")
+
+    render(path, stop_at=95)
+    assert recorded_frames(path) == 80
+
+    drawn, _ = render(path, **changes)
+    assert drawn[0] == 0 and len(drawn) == total
+    assert_same_video(path, expected)